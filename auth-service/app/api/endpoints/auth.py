@@ -1,14 +1,44 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
+from ...core import hashing
+from ...core.config import settings
+from ...core.security import create_access_token
 from ...db.session import get_db
-from ...schemas.user import UserCreate, User
+from ...schemas.user import Token, UserCreate, User
 from ...crud.user import create_user, get_user_by_email
 
 router = APIRouter()
 
+async def run_hasher(method, *args):
+    try:
+        return await method(*args)
+    except hashing.HasherOverloaded:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many concurrent password operations, try again later",
+            headers={"Retry-After": str(settings.HASHER_RETRY_AFTER)}
+        )
+
 @router.post("/register", response_model=User)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = get_user_by_email(db, email=user.email)
-    if db_user:
+async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
+    hashed_password = await run_hasher(hashing.password_hasher.hash, user.password)
+    db_user = await create_user(db=db, user=user, hashed_password=hashed_password)
+    if db_user is None:
         raise HTTPException(status_code=400, detail="Email already registered")
-    return create_user(db=db, user=user)
\ No newline at end of file
+    return db_user
+
+@router.post("/token", response_model=Token)
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    user = await get_user_by_email(db, email=form_data.username)
+    if not user or not await run_hasher(
+        hashing.password_hasher.verify, form_data.password, user.hashed_password
+    ):
+        raise HTTPException(
+            status_code=401,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return Token(access_token=create_access_token(user.email))
@@ -1,10 +1,30 @@
-from pydantic import BaseSettings
+from typing import Optional
+from pydantic import BaseSettings, validator
+
+# Anyone can sign tokens with these: docker-compose passes an unset
+# ${JWT_SECRET_KEY} as "", and the default is public.
+INSECURE_SECRETS = frozenset({"", "your-secret-key-here"})
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "postgresql://admin:1234@db_auth:5432/auth_db"
     SECRET_KEY: str = "your-secret-key-here"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: int = 30
+    CREATE_SCHEMA_ON_STARTUP: bool = True
+    BCRYPT_ROUNDS: int = 12
+    HASHER_WORKERS: Optional[int] = None
+    HASHER_MAX_PENDING: int = 64
+    HASHER_RETRY_AFTER: int = 1
+
+    @validator("SECRET_KEY", always=True)
+    def check_secret_key(cls, value):
+        if value in INSECURE_SECRETS:
+            raise ValueError("SECRET_KEY is empty or the default; set JWT_SECRET_KEY to a private key")
+        return value
 
     class Config:
         env_file = ".env"
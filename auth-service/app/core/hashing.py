@@ -0,0 +1,69 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from .config import settings
+from .metrics import HASHER_PENDING, PASSWORD_HASH_LATENCY
+from .security import get_password_hash, verify_password
+
+class HasherOverloaded(Exception):
+    pass
+
+class PasswordHasher:
+    """Runs bcrypt in worker processes so it neither holds the GIL nor the event loop.
+
+    At most ``max_pending`` calls may be running or queued; beyond that callers
+    get ``HasherOverloaded`` immediately instead of waiting behind the backlog.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pending: int = 64):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    async def _run(self, operation: str, func, *args):
+        if self.pending >= self.max_pending:
+            raise HasherOverloaded()
+        self.pending += 1
+        HASHER_PENDING.inc()
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+            HASHER_PENDING.dec()
+            PASSWORD_HASH_LATENCY.labels(operation).observe(time.perf_counter() - start)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run("verify", verify_password, plain_password, hashed_password)
+
+    def warm_up(self):
+        futures = [self._executor.submit(os.getpid) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+password_hasher: Optional[PasswordHasher] = None
+
+def start_password_hasher():
+    global password_hasher
+    password_hasher = PasswordHasher(
+        workers=settings.HASHER_WORKERS,
+        max_pending=settings.HASHER_MAX_PENDING
+    )
+    password_hasher.warm_up()
+
+def stop_password_hasher():
+    global password_hasher
+    if password_hasher:
+        password_hasher.shutdown()
+        password_hasher = None
@@ -0,0 +1,58 @@
+import time
+
+from fastapi import Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST, Gauge, Histogram, generate_latest
+from sqlalchemy import event
+
+REQUEST_LATENCY = Histogram(
+    "auth_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"]
+)
+REQUESTS_IN_FLIGHT = Gauge("auth_http_requests_in_flight", "HTTP requests being served")
+QUERY_LATENCY = Histogram("auth_db_query_duration_seconds", "Duration of SQL statements", ["operation"])
+PASSWORD_HASH_LATENCY = Histogram(
+    "auth_password_hash_duration_seconds",
+    "Wall time of bcrypt calls, including the wait for a hasher worker",
+    ["operation"],
+    buckets=(0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 1, 2, 5, 10)
+)
+HASHER_PENDING = Gauge("auth_password_hasher_pending", "bcrypt calls running or queued")
+POOL_CHECKED_OUT = Gauge("auth_db_pool_checked_out", "Connections in use")
+POOL_SIZE = Gauge("auth_db_pool_size", "Connections held by the pool")
+POOL_OVERFLOW = Gauge("auth_db_pool_overflow", "Connections opened beyond pool_size")
+
+def instrument_engine(engine):
+    sync_engine = engine.sync_engine
+    pool = sync_engine.pool
+    POOL_CHECKED_OUT.set_function(pool.checkedout)
+    POOL_SIZE.set_function(pool.size)
+    POOL_OVERFLOW.set_function(pool.overflow)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start"].pop()
+        operation = statement.lstrip().split(" ", 1)[0].upper()
+        QUERY_LATENCY.labels(operation).observe(time.perf_counter() - start)
+
+async def metrics_middleware(request: Request, call_next):
+    REQUESTS_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        REQUESTS_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        REQUEST_LATENCY.labels(
+            request.method, route.path if route is not None else "unmatched", status
+        ).observe(time.perf_counter() - start)
+
+def metrics_endpoint():
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
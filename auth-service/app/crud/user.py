@@ -1,18 +1,26 @@
-from sqlalchemy.orm import Session
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..models.user import User
 from ..schemas.user import UserCreate
-from ..core.security import get_password_hash
 
-def get_user(db: Session, user_id: int):
-    return db.query(User).filter(User.id == user_id).first()
+async def get_user(db: AsyncSession, user_id: int):
+    result = await db.execute(select(User).where(User.id == user_id))
+    return result.scalars().first()
 
-def get_user_by_email(db: Session, email: str):
-    return db.query(User).filter(User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
 
-def create_user(db: Session, user: UserCreate):
-    hashed_password = get_password_hash(user.password)
-    db_user = User(email=user.email, hashed_password=hashed_password)
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
\ No newline at end of file
+async def create_user(db: AsyncSession, user: UserCreate, hashed_password: str) -> Optional[User]:
+    """Inserts the user in one round trip; returns None if the email is taken."""
+    result = await db.execute(
+        insert(User)
+        .values(email=user.email, hashed_password=hashed_password)
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User.id, User.email, User.is_active)
+    )
+    db_user = result.first()
+    await db.commit()
+    return db_user
@@ -1,9 +1,22 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.db.session import engine, Base
+from app.core.config import settings
+from app.core.metrics import instrument_engine, metrics_endpoint, metrics_middleware
+from app.core.hashing import start_password_hasher, stop_password_hasher
+from app.db.session import create_schema, engine
 from app.api.endpoints.auth import router as auth_router
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app):
+    if settings.CREATE_SCHEMA_ON_STARTUP:
+        await create_schema()
+    start_password_hasher()
+    try:
+        yield
+    finally:
+        stop_password_hasher()
+        await engine.dispose()
 
 app = FastAPI(
     title="Auth Service",
@@ -11,9 +24,12 @@ app = FastAPI(
     version="1.0.0",
     openapi_url="/api/auth/openapi.json",
     docs_url="/api/auth/docs",
-    redoc_url="/api/auth/redoc"
+    redoc_url="/api/auth/redoc",
+    lifespan=lifespan
 )
 
+instrument_engine(engine)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -22,6 +38,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.middleware("http")(metrics_middleware)
+app.add_api_route("/api/auth/metrics", metrics_endpoint, include_in_schema=False)
+
 app.include_router(auth_router, prefix="/api/auth", tags=["auth"])
 
 @app.get("/api/auth/health")
@@ -11,4 +11,8 @@ class User(UserBase):
     is_active: bool
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class Token(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
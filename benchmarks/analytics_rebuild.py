@@ -0,0 +1,115 @@
+"""Time of a full analytics rebuild over 10M answers.
+
+With --seed a new two-question form gets --answers synthetic answers COPYed
+into the database configured through the POSTGRES_* variables, and the real
+rebuild runs over them end to end, batched columnar reads included. --form-id
+rebuilds a form that already has answers. Without either, only the vectorized
+aggregation over in-memory arrays is timed, which leaves out the reads from
+Postgres that dominate a rebuild.
+
+Usage:
+    python benchmarks/analytics_rebuild.py --seed --answers 10000000
+    python benchmarks/analytics_rebuild.py --form-id 42
+    python benchmarks/analytics_rebuild.py --answers 10000000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "forms-service"))
+
+from app import analytics, database  # noqa: E402
+from app.analytics import REBUILD_BATCH_SIZE, Accumulator  # noqa: E402
+from app.documents import refresh_documents  # noqa: E402
+from app.ingest import ANSWER_COLUMNS, SUBMISSION_COLUMNS  # noqa: E402
+from app.questions import insert_questions  # noqa: E402
+from app.schemas import FormCreate  # noqa: E402
+from forms_write import build_form  # noqa: E402
+
+# Submissions per COPY while seeding; each carries one scale and one radio answer.
+SEED_CHUNK = 100_000
+
+def run_synthetic(total: int, batch_size: int):
+    rng = np.random.default_rng(0)
+    option_ids = np.array([f"o{i}" for i in range(5)], dtype=object)
+    accumulator = Accumulator()
+    elapsed = 0.0
+    for offset in range(0, total, batch_size):
+        size = min(batch_size, total - offset)
+        half = size // 2
+        options = option_ids[rng.integers(0, len(option_ids), half)]
+        values = rng.integers(1, 11, size - half)
+        start = time.perf_counter()
+        accumulator.add_options("choice", options)
+        accumulator.add_scale("scale", values)
+        elapsed += time.perf_counter() - start
+    counted = sum(accumulator.options["choice"].values()) + sum(accumulator.scales["scale"].values())
+    print(f"aggregated {counted} in-memory answers in {elapsed:.2f}s "
+          f"({counted / elapsed / 1e6:.1f}M answers/s), database reads not included")
+
+async def seed(conn, answers: int) -> int:
+    """Creates a form with a 1..5 scale (q0) and a radio (q1) and COPYs ``answers`` answers into it."""
+    form = FormCreate(**build_form(2, title="Analytics rebuild benchmark"))
+    async with conn.transaction():
+        form_id = await conn.statements["insert_form"].fetchval(form.title, form.description)
+        await insert_questions(conn, form_id, form.questions)
+        await refresh_documents(conn, [form_id])
+
+    rng = np.random.default_rng(0)
+    submitted_at = datetime.now(timezone.utc)
+    remaining = answers // 2
+    start = time.perf_counter()
+    while remaining:
+        size = min(SEED_CHUNK, remaining)
+        ids = [uuid4() for _ in range(size)]
+        scales = rng.integers(1, 6, size).tolist()
+        options = rng.integers(0, 4, size).tolist()
+        async with conn.transaction():
+            await conn.copy_records_to_table(
+                "submissions", records=[(i, form_id, 1, submitted_at) for i in ids], columns=SUBMISSION_COLUMNS
+            )
+            await conn.copy_records_to_table(
+                "answers",
+                records=[row for i, value, option in zip(ids, scales, options) for row in (
+                    (i, form_id, "q0", None, value, None),
+                    (i, form_id, "q1", f"o{option}", None, None),
+                )],
+                columns=ANSWER_COLUMNS
+            )
+        remaining -= size
+    print(f"seeded form {form_id} with {answers // 2 * 2} answers in {time.perf_counter() - start:.2f}s")
+    return form_id
+
+async def run_database(form_id: int, batch_size: int, seed_answers: int = 0):
+    await database.create_db_pool()
+    try:
+        async with database.acquire() as conn:
+            if seed_answers:
+                form_id = await seed(conn, seed_answers)
+            start = time.perf_counter()
+            scanned = await analytics.rebuild(conn, form_id, batch_size)
+            elapsed = time.perf_counter() - start
+    finally:
+        await database.close_db_pool()
+    print(f"rebuilt form {form_id} from {scanned} answers in {elapsed:.2f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--answers", type=int, default=10_000_000)
+    parser.add_argument("--batch-size", type=int, default=REBUILD_BATCH_SIZE)
+    parser.add_argument("--form-id", type=int)
+    parser.add_argument("--seed", action="store_true",
+                        help="create a form with --answers answers in the database and rebuild it")
+    args = parser.parse_args()
+    if args.seed:
+        asyncio.run(run_database(None, args.batch_size, seed_answers=args.answers))
+    elif args.form_id is not None:
+        asyncio.run(run_database(args.form_id, args.batch_size))
+    else:
+        run_synthetic(args.answers, args.batch_size)
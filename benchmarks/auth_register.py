@@ -0,0 +1,43 @@
+"""Registrations per second (and per core) against a running auth-service.
+
+Usage:
+    python benchmarks/auth_register.py --url http://localhost/api/auth --cores 2
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+async def run(url: str, total: int, concurrency: int, cores: int):
+    url = url.rstrip("/")
+    statuses = {}
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(f"bench-{uuid.uuid4().hex}@example.com")
+
+    async def worker(client):
+        while not queue.empty():
+            email = queue.get_nowait()
+            response = await client.post(f"{url}/register", json={"email": email, "password": "benchmark"})
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    async with httpx.AsyncClient(timeout=60) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    ok = statuses.get(200, 0)
+    print(f"requests:        {total} in {elapsed:.2f}s, statuses {statuses}")
+    print(f"registrations/s: {ok / elapsed:.1f}")
+    print(f"per core:        {ok / elapsed / cores:.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost/api/auth")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--cores", type=int, default=1, help="CPU cores available to auth-service")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.requests, args.concurrency, args.cores))
@@ -0,0 +1,63 @@
+"""Latency of POST /forms and PUT /forms/{id} against question count.
+
+Usage:
+    python benchmarks/forms_write.py --url http://localhost/api/forms/forms/forms
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+QUESTION_COUNTS = [1, 10, 50, 100, 200, 500]
+
+def build_form(question_count: int, title: str = "Benchmark form"):
+    questions = []
+    for i in range(question_count):
+        if i % 2:
+            questions.append({
+                "id": f"q{i}",
+                "title": f"Question {i}",
+                "type": "radio",
+                "required": True,
+                "options": [{"id": f"o{j}", "value": f"Option {j}"} for j in range(4)]
+            })
+        else:
+            questions.append({
+                "id": f"q{i}",
+                "title": f"Question {i}",
+                "type": "linear_scale",
+                "min_value": 1,
+                "max_value": 5
+            })
+    return {"title": title, "description": "benchmark", "questions": questions}
+
+async def timed(request):
+    start = time.perf_counter()
+    response = await request
+    response.raise_for_status()
+    return (time.perf_counter() - start) * 1000, response
+
+async def run(url: str, repeat: int):
+    url = url.rstrip("/")
+    async with httpx.AsyncClient(timeout=60) as client:
+        print(f"{'questions':>10} {'create p50 ms':>14} {'update p50 ms':>14}")
+        for count in QUESTION_COUNTS:
+            payload = build_form(count)
+            create_ms, update_ms = [], []
+            for _ in range(repeat):
+                elapsed, response = await timed(client.post(f"{url}/", json=payload))
+                create_ms.append(elapsed)
+                form_id = response.json()["id"]
+                elapsed, _ = await timed(client.put(f"{url}/{form_id}", json=payload))
+                update_ms.append(elapsed)
+                await client.delete(f"{url}/{form_id}")
+            print(f"{count:>10} {statistics.median(create_ms):>14.2f} {statistics.median(update_ms):>14.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost/api/forms/forms/forms")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.repeat))
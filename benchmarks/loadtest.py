@@ -0,0 +1,448 @@
+"""Scripted load scenarios for forms-service and auth-service, with baselines.
+
+Runs against docker-compose (through nginx, the default URLs) or against the
+services started locally on a local Postgres. Every scenario sends a fixed
+number of requests from a fixed seed and reports p50/p95/p99 latency and
+requests per second. Results are stored as JSON; comparing a run against a
+stored baseline exits non-zero when any scenario regressed beyond the
+threshold. Scenarios seed data and leave it behind, so point the suite at a
+disposable database. Table-size scenarios count the forms already there and
+only import the difference, so repeated runs measure the same sizes.
+form_search seeds --search-table-size forms (a million by default) and only
+runs when named in --scenarios. Leave RATE_LIMIT_PER_SECOND unset (or 0) on
+the service under test, or the limiter answers most requests with 429.
+
+Usage:
+    python benchmarks/loadtest.py run --save benchmarks/baselines/local.json
+    python benchmarks/loadtest.py run --scenarios form_read_hot,form_list --baseline benchmarks/baselines/local.json
+    python benchmarks/loadtest.py run --scenarios form_search --search-table-size 100000
+    python benchmarks/loadtest.py compare benchmarks/baselines/local.json results.json --threshold 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+import numpy as np
+
+from forms_write import build_form
+
+class Stats:
+    def __init__(self):
+        self.latencies_ms = []
+        self.errors = 0
+        self.statuses = {}
+        self.elapsed = 0.0
+
+    def record(self, status: int, latency_ms: float):
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status >= 400:
+            self.errors += 1
+        else:
+            self.latencies_ms.append(latency_ms)
+
+    def summary(self) -> dict:
+        total = len(self.latencies_ms) + self.errors
+        latencies = np.array(self.latencies_ms or [0.0])
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        return {
+            "requests": total,
+            "errors": self.errors,
+            "error_rate": round(self.errors / total, 4) if total else 0.0,
+            "rps": round(total / self.elapsed, 2) if self.elapsed else 0.0,
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+        }
+
+async def drive(make_request, total: int, concurrency: int, stats_for=None) -> Stats:
+    """Sends ``total`` requests from ``concurrency`` closed-loop workers.
+
+    ``make_request(i)`` returns the awaitable response of request ``i``;
+    ``stats_for(i)`` optionally picks an extra Stats to record it in, which is
+    how the mixed workload breaks its latencies down per operation.
+    """
+    stats = Stats()
+    counter = iter(range(total))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                status = (await make_request(i)).status_code
+            except httpx.HTTPError:
+                status = 599
+            latency_ms = (time.perf_counter() - start) * 1000
+            stats.record(status, latency_ms)
+            if stats_for is not None:
+                stats_for(i).record(status, latency_ms)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+class Target:
+    def __init__(self, client: httpx.AsyncClient, args):
+        self.client = client
+        self.forms_url = args.forms_url.rstrip("/")
+        self.auth_url = args.auth_url.rstrip("/")
+        self.requests = args.requests
+        self.concurrency = args.concurrency
+        self.warmup = args.warmup
+        self.rng = random.Random(args.seed)
+        self.args = args
+
+    async def measure(self, make_request, total=None, stats_for=None) -> Stats:
+        if self.warmup:
+            await drive(make_request, self.warmup, self.concurrency)
+        return await drive(make_request, total or self.requests, self.concurrency, stats_for)
+
+    async def create_forms(self, count: int, question_count: int) -> list:
+        payload = build_form(question_count)
+        ids = []
+
+        async def create(_):
+            response = await self.client.post(f"{self.forms_url}/", json=payload)
+            if response.status_code == 200:
+                ids.append(response.json()["id"])
+            return response
+
+        await drive(create, count, self.concurrency)
+        if not ids:
+            raise RuntimeError("Could not create forms; is the token valid and the service up?")
+        return ids
+
+    async def count_forms(self) -> int:
+        total, cursor = 0, None
+        while True:
+            params = {"limit": MAX_PAGE_SIZE, "summary": "true"}
+            if cursor:
+                params["cursor"] = cursor
+            response = await self.client.get(f"{self.forms_url}/", params=params)
+            response.raise_for_status()
+            total += len(response.json())
+            cursor = response.headers.get("x-next-cursor")
+            if not cursor:
+                return total
+
+    async def seed_to(self, size: int, question_count: int, make_form=None) -> bool:
+        """Imports forms until the table holds ``size``; False if it already holds more."""
+        existing = await self.count_forms()
+        if existing > size:
+            print(f"warning: {existing} forms already stored, skipping the {size} forms measurement",
+                  file=sys.stderr)
+            return False
+        if existing < size:
+            await self.import_forms(size - existing, question_count, make_form)
+        return True
+
+    async def import_forms(self, count: int, question_count: int, make_form=None):
+        line = json.dumps(build_form(question_count, title="Seeded form")).encode() + b"\n"
+
+        async def body():
+            for _ in range(count):
+                yield json.dumps(make_form()).encode() + b"\n" if make_form else line
+
+        response = await self.client.post(f"{self.forms_url}/import", content=body(), timeout=None)
+        response.raise_for_status()
+        return response.json()["imported"]
+
+async def authenticate(client: httpx.AsyncClient, auth_url: str):
+    """Registers a throwaway user and returns its bearer token, or None if auth-service is unreachable."""
+    email = f"loadtest-{uuid.uuid4().hex}@example.com"
+    try:
+        await client.post(f"{auth_url}/register", json={"email": email, "password": "loadtest"})
+        response = await client.post(f"{auth_url}/token", data={"username": email, "password": "loadtest"})
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        print(f"warning: no token from auth-service ({e}), sending unauthenticated requests", file=sys.stderr)
+        return None
+    return response.json()["access_token"]
+
+def answers_for(question_count: int, rng: random.Random) -> dict:
+    # Matches build_form: odd questions are radios over o0..o3, even ones 1..5 scales.
+    return {
+        f"q{i}": f"o{rng.randrange(4)}" if i % 2 else rng.randint(1, 5)
+        for i in range(question_count)
+    }
+
+async def form_create(target: Target) -> dict:
+    results = {}
+    for question_count in target.args.question_counts:
+        payload = build_form(question_count)
+        created = []
+
+        async def create(_):
+            response = await target.client.post(f"{target.forms_url}/", json=payload)
+            if response.status_code == 200:
+                created.append(response.json()["id"])
+            return response
+
+        results[f"form_create_q{question_count}"] = (await target.measure(create)).summary()
+        # Keep the table size stable for the scenarios that follow.
+        await drive(lambda i: target.client.delete(f"{target.forms_url}/{created[i]}"),
+                    len(created), target.concurrency)
+    return results
+
+async def form_read_hot(target: Target) -> dict:
+    form_id = (await target.create_forms(1, target.args.read_questions))[0]
+    stats = await target.measure(lambda _: target.client.get(f"{target.forms_url}/{form_id}"))
+    return {"form_read_hot": stats.summary()}
+
+async def form_read_cold(target: Target) -> dict:
+    # Every form is read exactly once, so each request misses the form cache.
+    ids = await target.create_forms(target.requests, target.args.read_questions)
+    stats = await drive(lambda i: target.client.get(f"{target.forms_url}/{ids[i]}"),
+                        len(ids), target.concurrency)
+    return {"form_read_cold": stats.summary()}
+
+async def collect_cursors(target: Target, pages: int) -> list:
+    cursors, cursor = [None], None
+    for _ in range(pages - 1):
+        params = {"limit": 50, "summary": "true"}
+        if cursor:
+            params["cursor"] = cursor
+        response = await target.client.get(f"{target.forms_url}/", params=params)
+        response.raise_for_status()
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+        cursors.append(cursor)
+    return cursors
+
+async def form_list(target: Target) -> dict:
+    results = {}
+    for size in sorted(target.args.table_sizes):
+        if not await target.seed_to(size, question_count=3):
+            continue
+        cursors = await collect_cursors(target, target.args.list_pages)
+
+        def list_page(i):
+            params = {"limit": 50, "summary": "true"}
+            cursor = cursors[i % len(cursors)]
+            if cursor:
+                params["cursor"] = cursor
+            return target.client.get(f"{target.forms_url}/", params=params)
+
+        results[f"form_list_{size}"] = (await target.measure(list_page)).summary()
+    return results
+
+async def auth_register(target: Target) -> dict:
+    emails = [f"loadtest-{uuid.uuid4().hex}@example.com" for _ in range(target.requests)]
+    stats = await drive(
+        lambda i: target.client.post(f"{target.auth_url}/register",
+                                     json={"email": emails[i], "password": "loadtest"}),
+        len(emails), target.concurrency
+    )
+    return {"auth_register": stats.summary()}
+
+MIXED_WEIGHTS = {"read": 60, "list": 15, "submit": 15, "create": 10}
+
+async def mixed(target: Target) -> dict:
+    question_count = target.args.read_questions
+    ids = await target.create_forms(100, question_count)
+    operations = target.rng.choices(list(MIXED_WEIGHTS), weights=list(MIXED_WEIGHTS.values()),
+                                    k=target.requests + target.warmup)
+    form_ids = [target.rng.choice(ids) for _ in operations]
+    answers = [answers_for(question_count, target.rng) for _ in operations]
+    payload = build_form(question_count)
+    per_operation = {operation: Stats() for operation in MIXED_WEIGHTS}
+
+    def request(i):
+        operation = operations[i]
+        if operation == "read":
+            return target.client.get(f"{target.forms_url}/{form_ids[i]}")
+        if operation == "list":
+            return target.client.get(f"{target.forms_url}/", params={"limit": 50, "summary": "true"})
+        if operation == "submit":
+            return target.client.post(f"{target.forms_url}/{form_ids[i]}/submissions",
+                                      json={"answers": answers[i]})
+        return target.client.post(f"{target.forms_url}/", json=payload)
+
+    if target.warmup:
+        await drive(lambda i: request(target.requests + i), target.warmup, target.concurrency)
+    overall = await drive(request, target.requests, target.concurrency, lambda i: per_operation[operations[i]])
+    results = {"mixed": overall.summary()}
+    for operation, stats in per_operation.items():
+        stats.elapsed = overall.elapsed
+        results[f"mixed.{operation}"] = stats.summary()
+    return results
+
+SEARCH_WORDS = (
+    "customer satisfaction survey feedback event registration employee engagement product "
+    "quiz course evaluation onboarding delivery support quality training conference "
+    "опрос анкета отзыв клиент сотрудник мероприятие регистрация качество доставка "
+    "обучение курс продукт поддержка удовлетворенность тест конференция"
+).split()
+
+def search_form(rng: random.Random, question_count: int) -> dict:
+    form = build_form(question_count, title=" ".join(rng.sample(SEARCH_WORDS, 3)))
+    form["description"] = " ".join(rng.sample(SEARCH_WORDS, 8))
+    for question in form["questions"]:
+        question["title"] = " ".join(rng.sample(SEARCH_WORDS, 2))
+    return form
+
+async def form_search(target: Target) -> dict:
+    size = target.args.search_table_size
+    if not await target.seed_to(size, 3, make_form=lambda: search_form(target.rng, 3)):
+        return {}
+    queries = [" ".join(target.rng.sample(SEARCH_WORDS, 2)) for _ in range(target.requests + target.warmup)]
+    stats = await target.measure(lambda i: target.client.get(
+        f"{target.forms_url}/search", params={"q": queries[i], "limit": 20}
+    ))
+    return {f"form_search_{size}": stats.summary()}
+
+SCENARIOS = {
+    "form_create": form_create,
+    "form_read_hot": form_read_hot,
+    "form_read_cold": form_read_cold,
+    "form_list": form_list,
+    "auth_register": auth_register,
+    "mixed": mixed,
+    "form_search": form_search,
+}
+
+# Seeding its table takes far longer than the other scenarios together.
+OPT_IN_SCENARIOS = {"form_search"}
+
+# GET /forms/ refuses larger pages.
+MAX_PAGE_SIZE = 200
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Latencies regress when they grow, throughput when it shrinks.
+COMPARED_METRICS = {"p50_ms": 1, "p95_ms": 1, "p99_ms": 1, "rps": -1}
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """Prints a comparison table and returns the (scenario, metric) pairs that regressed."""
+    regressions = []
+    print(f"{'scenario':<22} {'metric':<10} {'baseline':>10} {'current':>10} {'change':>9}")
+    for name, result in current["scenarios"].items():
+        reference = baseline["scenarios"].get(name)
+        if reference is None:
+            print(f"{name:<22} {'(new)':<10}")
+            continue
+        for metric, direction in COMPARED_METRICS.items():
+            before, after = reference[metric], result[metric]
+            change = (after - before) / before * 100 if before else 0.0
+            regressed = change * direction > threshold
+            if regressed:
+                regressions.append((name, metric))
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{name:<22} {metric:<10} {before:>10.2f} {after:>10.2f} {change:>8.1f}%{flag}")
+        if result["error_rate"] > reference["error_rate"] + 0.01:
+            regressions.append((name, "error_rate"))
+            print(f"{name:<22} {'errors':<10} {reference['error_rate']:>10.2%} "
+                  f"{result['error_rate']:>10.2%}            REGRESSION")
+    return regressions
+
+def print_results(results: dict):
+    print(f"{'scenario':<22} {'requests':>9} {'errors':>7} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, r in results.items():
+        print(f"{name:<22} {r['requests']:>9} {r['errors']:>7} {r['rps']:>9.1f} "
+              f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+
+async def run(args) -> dict:
+    headers = {}
+    async with httpx.AsyncClient(timeout=60) as client:
+        token = args.token or await authenticate(client, args.auth_url.rstrip("/"))
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(timeout=60, headers=headers, limits=limits) as client:
+        target = Target(client, args)
+        results = {}
+        for name in args.scenarios:
+            print(f"running {name}...", file=sys.stderr)
+            results.update(await SCENARIOS[name](target))
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "forms_url": args.forms_url,
+            "auth_url": args.auth_url,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+        },
+        "scenarios": results,
+    }
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run scenarios and report latency and throughput")
+    run_parser.add_argument("--forms-url", default="http://localhost/api/forms/forms/forms")
+    run_parser.add_argument("--auth-url", default="http://localhost/api/auth")
+    run_parser.add_argument("--token", help="bearer token for forms-service; by default a user is registered")
+    run_parser.add_argument("--scenarios", default=",".join(name for name in SCENARIOS if name not in OPT_IN_SCENARIOS),
+                            type=lambda value: value.split(","), help="comma-separated subset of: "
+                            + ", ".join(SCENARIOS) + "; " + ", ".join(OPT_IN_SCENARIOS)
+                            + " only runs when named")
+    run_parser.add_argument("--requests", type=int, default=1000, help="measured requests per scenario")
+    run_parser.add_argument("--concurrency", type=int, default=20)
+    run_parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests before each scenario")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--question-counts", type=lambda value: [int(v) for v in value.split(",")],
+                            default=[10, 100])
+    run_parser.add_argument("--read-questions", type=int, default=20)
+    run_parser.add_argument("--table-sizes", type=lambda value: [int(v) for v in value.split(",")],
+                            default=[1000, 10000, 100000])
+    run_parser.add_argument("--search-table-size", type=int, default=1000000,
+                            help="forms the table holds during form_search, topped up with searchable ones")
+    run_parser.add_argument("--list-pages", type=int, default=20, help="distinct cursor pages per listing scenario")
+    run_parser.add_argument("--save", help="write the results JSON here")
+    run_parser.add_argument("--baseline", help="compare against this results JSON")
+    run_parser.add_argument("--threshold", type=float, default=10.0, help="allowed change in percent")
+
+    compare_parser = commands.add_parser("compare", help="compare two stored results")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="allowed change in percent")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        baseline, current = load(args.baseline), load(args.current)
+    else:
+        unknown = set(args.scenarios) - set(SCENARIOS)
+        if unknown:
+            parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+        current = asyncio.run(run(args))
+        print_results(current["scenarios"])
+        if args.save:
+            os.makedirs(os.path.dirname(args.save) or ".", exist_ok=True)
+            with open(args.save, "w") as f:
+                json.dump(current, f, indent=2)
+        if not args.baseline:
+            return 0
+        baseline = load(args.baseline)
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regressions beyond {args.threshold}%")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,90 @@
+"""Bytes and CPU per GET /forms/{id} response, default encoder vs the cached pipeline.
+
+"before" is what FastAPI does with a returned dict: validate it against
+FormResponse, run jsonable_encoder and render with the standard json module.
+"after" serves the stored document bytes; cold compresses them on the request,
+warm finds the compressed bytes in the form cache.
+
+Usage:
+    python benchmarks/response_encoding.py --questions 200 --options 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "forms-service"))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app.cache import FormCache, MemoryBackend  # noqa: E402
+from app.responses import SUPPORTED_ENCODINGS, compress  # noqa: E402
+from app.schemas import FormResponse  # noqa: E402
+from app.serialization import dumps_bytes  # noqa: E402
+
+def build_document(question_count: int, option_count: int) -> dict:
+    return {
+        "id": 1,
+        "title": "Большая анкета / Large survey",
+        "description": "benchmark",
+        "version": 1,
+        "questions": [{
+            "id": f"q{i}",
+            "title": f"Вопрос {i}: how satisfied are you with this part of the service?",
+            "type": "radio",
+            "required": True,
+            "options": [{"id": f"o{j}", "value": f"Вариант ответа {j} / answer option {j}"}
+                        for j in range(option_count)],
+            "min_value": None,
+            "max_value": None,
+            "min_label": None,
+            "max_label": None
+        } for i in range(question_count)]
+    }
+
+def cpu_us(fn, iterations: int) -> float:
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations * 1e6
+
+def before(document: dict) -> bytes:
+    model = FormResponse(**document)
+    return JSONResponse(jsonable_encoder(model)).body
+
+async def run(question_count: int, option_count: int, iterations: int):
+    document = build_document(question_count, option_count)
+    stored = dumps_bytes(document)
+    cache = FormCache(MemoryBackend())
+    await cache.put(1, 0, stored)
+    for encoding in SUPPORTED_ENCODINGS:
+        await cache.put_encoded(1, 0, encoding, compress(stored, encoding))
+
+    rows = [("before: validate + json", len(before(document)), cpu_us(lambda: before(document), iterations))]
+    rows.append(("after: stored bytes", len(stored), 0.0))
+    for encoding in SUPPORTED_ENCODINGS:
+        size = len(compress(stored, encoding))
+        rows.append((f"after: {encoding}, cold", size, cpu_us(lambda: compress(stored, encoding), iterations)))
+
+        start = time.process_time()
+        for _ in range(iterations):
+            await cache.get_encoded(1, 0, encoding)
+        warm_us = (time.process_time() - start) / iterations * 1e6
+        rows.append((f"after: {encoding}, cached", size, warm_us))
+
+    print(f"{question_count} questions x {option_count} options, {iterations} iterations")
+    print(f"{'pipeline':<26} {'bytes':>9} {'cpu us/response':>16}")
+    for name, size, us in rows:
+        print(f"{name:<26} {size:>9} {us:>16.1f}")
+    print(json.dumps({name: {"bytes": size, "cpu_us": round(us, 1)} for name, size, us in rows}))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--options", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.questions, args.options, args.iterations))
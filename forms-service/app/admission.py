@@ -0,0 +1,150 @@
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse
+from prometheus_client import Counter, Gauge
+
+load_dotenv()
+
+REQUESTS_SHED = Counter("forms_requests_shed_total", "Requests refused before reaching a handler", ["reason"])
+ADMISSION_WAITING = Gauge("forms_admission_waiting", "Requests waiting for an admission slot")
+
+# Never limited, so monitoring keeps working while the service sheds load.
+EXEMPT_PATHS = frozenset({"/metrics"})
+
+class PoolExhausted(HTTPException):
+    """No database connection became free within DB_ACQUIRE_TIMEOUT."""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__(
+            status_code=503,
+            detail="Database is overloaded, try again later",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+class TokenBucketLimiter:
+    """Per-client token buckets: ``rate`` requests per second with bursts up to ``burst``.
+
+    Buckets live in a bounded LRU, so a flood of distinct clients evicts the
+    least recently seen ones instead of growing memory. Every worker keeps its
+    own buckets; with N workers a client gets up to N times the rate.
+    """
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def acquire(self, client: str) -> float:
+        """Takes a token for ``client``; returns 0 if allowed, else seconds until the next token."""
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        self._buckets[client] = (tokens, now)
+        self._buckets.move_to_end(client)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+class AdmissionController:
+    """Caps requests in flight and lets the excess wait briefly for a slot.
+
+    Requests beyond ``limit`` wait at most ``max_wait`` seconds, and at most
+    ``max_waiting`` of them at a time; everything else is refused at once
+    rather than queueing behind an exhausted connection pool.
+    """
+
+    def __init__(self, limit: int, max_wait: float, max_waiting: int):
+        self.limit = limit
+        self.max_wait = max_wait
+        self.max_waiting = max_waiting
+        self.waiting = 0
+        self._slots = asyncio.Semaphore(limit)
+        ADMISSION_WAITING.set_function(lambda: self.waiting)
+
+    async def enter(self) -> bool:
+        if not self._slots.locked():
+            await self._slots.acquire()
+            return True
+        if self.waiting >= self.max_waiting:
+            return False
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.max_wait)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+
+    def leave(self):
+        self._slots.release()
+
+def client_address(request: Request) -> str:
+    # nginx sets X-Real-IP; without it the service is reached directly.
+    real_ip = request.headers.get("x-real-ip")
+    if real_ip:
+        return real_ip
+    return request.client.host if request.client else "unknown"
+
+def refuse(status_code: int, detail: str, retry_after: float, reason: str) -> JSONResponse:
+    REQUESTS_SHED.labels(reason).inc()
+    return JSONResponse(
+        status_code=status_code,
+        content={"detail": detail},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+def create_rate_limiter() -> Optional[TokenBucketLimiter]:
+    # Off unless configured: behind nginx every client may share one address,
+    # and benchmarks/loadtest.py drives far more than any per-client limit.
+    rate = float(os.getenv('RATE_LIMIT_PER_SECOND', 0))
+    if rate <= 0:
+        return None
+    return TokenBucketLimiter(
+        rate=rate,
+        burst=float(os.getenv('RATE_LIMIT_BURST', rate * 2)),
+        max_clients=int(os.getenv('RATE_LIMIT_MAX_CLIENTS', 10000))
+    )
+
+def create_admission_controller() -> AdmissionController:
+    # Cached reads never touch the pool, so a few requests per connection can
+    # be in flight without anyone waiting on DB_ACQUIRE_TIMEOUT.
+    pool_size = int(os.getenv('DB_POOL_MAX_SIZE', 10))
+    limit = int(os.getenv('ADMISSION_CONCURRENCY', pool_size * 4))
+    return AdmissionController(
+        limit=limit,
+        max_wait=float(os.getenv('ADMISSION_MAX_WAIT', 0.5)),
+        max_waiting=int(os.getenv('ADMISSION_MAX_WAITING', limit))
+    )
+
+rate_limiter = create_rate_limiter()
+admission_controller = create_admission_controller()
+
+async def admission_middleware(request: Request, call_next):
+    if request.url.path in EXEMPT_PATHS:
+        return await call_next(request)
+
+    if rate_limiter is not None:
+        wait = rate_limiter.acquire(client_address(request))
+        if wait:
+            return refuse(429, "Too many requests", wait, "rate_limited")
+
+    if not await admission_controller.enter():
+        return refuse(503, "Service is overloaded, try again later", 1, "overloaded")
+    try:
+        return await call_next(request)
+    finally:
+        admission_controller.leave()
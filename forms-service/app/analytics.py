@@ -0,0 +1,211 @@
+import argparse
+import asyncio
+import logging
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from . import database
+from .schemas import MAX_SCALE_VALUES
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (25, 50, 75, 90, 99)
+REBUILD_BATCH_SIZE = 200000
+
+# First key of the transaction-level advisory locks that serialize a form's
+# rebuild against flushes of the same form; the second key is the form id.
+ANALYTICS_LOCK = 1
+
+async def apply_increments(conn, batch: Iterable):
+    """Adds a flushed batch of submissions to the aggregate tables.
+
+    Runs in the transaction that copies the answers, so aggregates and raw
+    answers commit together. Keys are sorted to keep concurrent flushes from
+    deadlocking on the same rows. The shared per-form locks let flushes run
+    side by side but wait for a rebuild of one of their forms to commit.
+    """
+    forms = Counter()
+    options = Counter()
+    scales = Counter()
+    for submission in batch:
+        forms[submission.form_id] += 1
+        for question_id, option_id, value_int, _ in submission.answers:
+            if option_id is not None:
+                options[(submission.form_id, question_id, option_id)] += 1
+            elif value_int is not None:
+                scales[(submission.form_id, question_id, value_int)] += 1
+
+    form_keys = sorted(forms)
+    await conn.statements["lock_analytics_shared"].fetch(ANALYTICS_LOCK, form_keys)
+    await conn.statements["increment_submission_counts"].fetch(
+        form_keys, [forms[key] for key in form_keys]
+    )
+    if options:
+        keys = sorted(options)
+        await conn.statements["increment_option_counts"].fetch(
+            [k[0] for k in keys], [k[1] for k in keys], [k[2] for k in keys],
+            [options[k] for k in keys]
+        )
+    if scales:
+        keys = sorted(scales)
+        await conn.statements["increment_scale_counts"].fetch(
+            [k[0] for k in keys], [k[1] for k in keys], [k[2] for k in keys],
+            [scales[k] for k in keys]
+        )
+
+def scale_summary(values: np.ndarray, counts: np.ndarray) -> dict:
+    total = int(counts.sum())
+    if total == 0:
+        return {"count": 0, "mean": None, "percentiles": {}}
+    cumulative = np.cumsum(counts)
+    ranks = np.ceil(np.array(PERCENTILES) / 100 * total)
+    positions = np.searchsorted(cumulative, ranks, side="left")
+    return {
+        "count": total,
+        "mean": float(np.dot(values, counts) / total),
+        "percentiles": {f"p{p}": int(values[i]) for p, i in zip(PERCENTILES, positions)},
+    }
+
+def summarize(document: dict, submission_count: int, option_rows, scale_rows) -> dict:
+    options: Dict[str, Dict[str, int]] = {}
+    for row in option_rows:
+        options.setdefault(row["question_id"], {})[row["option_id"]] = row["count"]
+    scales: Dict[str, Dict[int, int]] = {}
+    for row in scale_rows:
+        scales.setdefault(row["question_id"], {})[row["value"]] = row["count"]
+
+    questions = []
+    for question in document["questions"]:
+        summary = {"id": question["id"], "title": question["title"], "type": question["type"]}
+        if question["type"] == "linear_scale":
+            stored = scales.get(question["id"], {})
+            low = question.get("min_value")
+            high = question.get("max_value")
+            # Forms stored before the range was validated may have huge scales.
+            if low is not None and high is not None and 0 <= high - low < MAX_SCALE_VALUES:
+                values = np.arange(low, high + 1)
+            else:
+                values = np.array(sorted(stored), dtype=np.int64)
+            counts = np.array([stored.get(int(v), 0) for v in values], dtype=np.int64)
+            summary.update(scale_summary(values, counts))
+            summary["histogram"] = {int(v): int(c) for v, c in zip(values, counts)}
+        elif question.get("options"):
+            stored = options.get(question["id"], {})
+            summary["options"] = [
+                {"id": opt["id"], "value": opt["value"], "count": stored.get(opt["id"], 0)}
+                for opt in question["options"]
+            ]
+        else:
+            continue
+        questions.append(summary)
+    return {"form_id": document["id"], "submissions": submission_count, "questions": questions}
+
+class Accumulator:
+    """Vectorized counts over columnar answer batches, merged across batches."""
+
+    def __init__(self):
+        self.options: Dict[str, Counter] = {}
+        self.scales: Dict[str, Counter] = {}
+
+    def add_options(self, question_id: str, option_ids: np.ndarray):
+        keys, counts = np.unique(option_ids, return_counts=True)
+        self.options.setdefault(question_id, Counter()).update(dict(zip(keys.tolist(), counts.tolist())))
+
+    def add_scale(self, question_id: str, values: np.ndarray):
+        low = int(values.min())
+        if int(values.max()) - low < MAX_SCALE_VALUES:
+            counts = np.bincount(values - low)
+            nonzero = np.flatnonzero(counts)
+            keys, counts = nonzero + low, counts[nonzero]
+        else:
+            keys, counts = np.unique(values, return_counts=True)
+        self.scales.setdefault(question_id, Counter()).update(dict(zip(keys.tolist(), counts.tolist())))
+
+async def rebuild(conn, form_id: int, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    """Recomputes a form's aggregates from its raw answers.
+
+    The exclusive advisory lock on the form holds back flushes of this form
+    until the new aggregates commit, so no increment is lost or counted twice;
+    flushes of other forms go on.
+    """
+    accumulator = Accumulator()
+    scanned = 0
+    async with conn.transaction():
+        await conn.execute("SELECT pg_advisory_xact_lock($1::int, $2::int)", ANALYTICS_LOCK, form_id)
+        last_id = 0
+        while True:
+            groups = await conn.fetch(
+                """
+                SELECT question_id,
+                       array_agg(option_id) FILTER (WHERE option_id IS NOT NULL) AS option_ids,
+                       array_agg(value_int) FILTER (WHERE value_int IS NOT NULL) AS values,
+                       count(*) AS answers,
+                       max(id) AS last_id
+                FROM (
+                    SELECT id, question_id, option_id, value_int FROM answers
+                    WHERE form_id = $1 AND id > $2
+                    ORDER BY id LIMIT $3
+                ) batch
+                GROUP BY question_id
+                """,
+                form_id, last_id, batch_size
+            )
+            if not groups:
+                break
+            for group in groups:
+                if group["option_ids"]:
+                    accumulator.add_options(group["question_id"], np.array(group["option_ids"], dtype=object))
+                if group["values"]:
+                    accumulator.add_scale(group["question_id"], np.array(group["values"], dtype=np.int64))
+                scanned += group["answers"]
+            last_id = max(group["last_id"] for group in groups)
+
+        await conn.execute("DELETE FROM question_option_counts WHERE form_id = $1", form_id)
+        await conn.execute("DELETE FROM question_scale_counts WHERE form_id = $1", form_id)
+        await conn.execute(
+            """
+            INSERT INTO form_submission_counts (form_id, count)
+            SELECT $1, count(*) FROM submissions WHERE form_id = $1
+            ON CONFLICT (form_id) DO UPDATE SET count = EXCLUDED.count
+            """,
+            form_id
+        )
+        option_keys = [(q, o, c) for q, counts in accumulator.options.items() for o, c in counts.items()]
+        scale_keys = [(q, v, c) for q, counts in accumulator.scales.items() for v, c in counts.items()]
+        await conn.execute(
+            """
+            INSERT INTO question_option_counts (form_id, question_id, option_id, count)
+            SELECT $1, * FROM unnest($2::text[], $3::text[], $4::bigint[])
+            """,
+            form_id, [k[0] for k in option_keys], [k[1] for k in option_keys], [k[2] for k in option_keys]
+        )
+        await conn.execute(
+            """
+            INSERT INTO question_scale_counts (form_id, question_id, value, count)
+            SELECT $1, * FROM unnest($2::text[], $3::int[], $4::bigint[])
+            """,
+            form_id, [k[0] for k in scale_keys], [k[1] for k in scale_keys], [k[2] for k in scale_keys]
+        )
+    return scanned
+
+async def main(form_ids: Optional[List[int]], batch_size: int):
+    await database.create_db_pool()
+    try:
+        async with database.acquire() as conn:
+            if not form_ids:
+                form_ids = [row["id"] for row in await conn.fetch("SELECT id FROM forms ORDER BY id")]
+            for form_id in form_ids:
+                scanned = await rebuild(conn, form_id, batch_size)
+                logger.info(f"Rebuilt analytics for form {form_id} from {scanned} answers")
+    finally:
+        await database.close_db_pool()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Rebuild per-form answer analytics")
+    parser.add_argument("form_ids", nargs="*", type=int, help="forms to rebuild, all by default")
+    parser.add_argument("--batch-size", type=int, default=REBUILD_BATCH_SIZE)
+    args = parser.parse_args()
+    asyncio.run(main(args.form_ids, args.batch_size))
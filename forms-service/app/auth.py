@@ -0,0 +1,88 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError, jwt
+
+class TokenVerifier:
+    """Verifies access tokens issued by auth-service locally, without a network hop.
+
+    Recently verified tokens are kept in a bounded LRU keyed by the token's
+    SHA-256, so repeated requests skip the signature check until the token expires.
+    """
+
+    def __init__(self, secret_key: str, algorithm: str = "HS256", max_entries: int = 4096):
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, dict]" = OrderedDict()
+
+    def verify(self, token: str) -> dict:
+        key = hashlib.sha256(token.encode()).digest()
+        claims = self._entries.get(key)
+        if claims is not None:
+            if claims["exp"] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return claims
+            del self._entries[key]
+
+        self.misses += 1
+        claims = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+        if "exp" not in claims:
+            raise JWTError("Token has no expiry")
+        self._entries[key] = claims
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return claims
+
+token_verifier = TokenVerifier(
+    secret_key=os.getenv('JWT_SECRET_KEY', 'your-secret-key-here'),
+    algorithm=os.getenv('JWT_ALGORITHM', 'HS256'),
+    max_entries=int(os.getenv('AUTH_TOKEN_CACHE_SIZE', 4096))
+)
+
+AUTH_REQUIRED = os.getenv('AUTH_REQUIRED', 'false').lower() == 'true'
+
+# An unset ${JWT_SECRET_KEY} in docker-compose arrives as "", and the default
+# is public; python-jose signs and verifies HS256 with either.
+INSECURE_SECRETS = frozenset({"", "your-secret-key-here"})
+
+def check_secret():
+    """Refuses to enforce auth with a secret anyone can sign tokens with."""
+    if AUTH_REQUIRED and token_verifier.secret_key in INSECURE_SECRETS:
+        raise RuntimeError("AUTH_REQUIRED is enabled but JWT_SECRET_KEY is empty or the default; set a private key")
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)
+) -> dict:
+    if credentials is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    try:
+        return token_verifier.verify(credentials.credentials)
+    except JWTError:
+        raise HTTPException(
+            status_code=401,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+async def require_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)
+) -> Optional[dict]:
+    """Like get_current_user, but a no-op unless AUTH_REQUIRED is enabled."""
+    if not AUTH_REQUIRED and credentials is None:
+        return None
+    return await get_current_user(credentials)
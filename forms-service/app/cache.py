@@ -0,0 +1,164 @@
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+class CachedForm(NamedTuple):
+    etag: str
+    body: bytes
+
+class MemoryBackend:
+    """Per-process LRU with a TTL. Also serves as the shared-cache stand-in in tests."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def close(self):
+        self._entries.clear()
+
+class RedisBackend:
+    """Cache shared by all workers. Requires the optional ``redis`` package."""
+
+    def __init__(self, url: str, ttl: float = 300):
+        import redis.asyncio as redis
+
+        self.ttl = ttl
+        self.evictions = 0
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes):
+        await self._client.set(key, value, ex=int(self.ttl))
+
+    async def get_counter(self, key: str) -> int:
+        value = await self._client.get(key)
+        return int(value) if value else 0
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(key)
+
+    async def close(self):
+        await self._client.close()
+
+class FormCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _version_key(form_id: int) -> str:
+        return f"form:{form_id}:version"
+
+    @staticmethod
+    def _document_key(form_id: int, version: int) -> str:
+        return f"form:{form_id}:v{version}"
+
+    async def version(self, form_id: int) -> int:
+        return await self.backend.get_counter(self._version_key(form_id))
+
+    async def get(self, form_id: int, version: int) -> Optional[CachedForm]:
+        raw = await self.backend.get(self._document_key(form_id, version))
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        etag, body = raw.split(b"\n", 1)
+        return CachedForm(etag.decode(), body)
+
+    async def put(self, form_id: int, version: int, body: bytes) -> CachedForm:
+        etag = '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+        await self.backend.set(self._document_key(form_id, version), etag.encode() + b"\n" + body)
+        return CachedForm(etag, body)
+
+    async def get_encoded(self, form_id: int, version: int, encoding: str) -> Optional[bytes]:
+        return await self.backend.get(f"{self._document_key(form_id, version)}:{encoding}")
+
+    async def put_encoded(self, form_id: int, version: int, encoding: str, body: bytes):
+        """Keeps the compressed document next to the plain one, dropped by the same invalidation."""
+        await self.backend.set(f"{self._document_key(form_id, version)}:{encoding}", body)
+
+    async def invalidate(self, form_id: int):
+        await self.backend.incr(self._version_key(form_id))
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.backend.evictions,
+        }
+
+form_cache: Optional[FormCache] = None
+
+# Without FORMS_CACHE_URL every worker keeps its own cache and never sees the
+# invalidations of the others, so the TTL is what bounds how long another
+# worker or replica may serve a changed or deleted form.
+SHARED_CACHE_TTL = 300
+LOCAL_CACHE_TTL = 5
+
+def create_form_cache(backend=None):
+    global form_cache
+    if backend is None:
+        url = os.getenv('FORMS_CACHE_URL')
+        if url:
+            backend = RedisBackend(url, ttl=float(os.getenv('FORMS_CACHE_TTL', SHARED_CACHE_TTL)))
+        else:
+            ttl = float(os.getenv('FORMS_CACHE_TTL', LOCAL_CACHE_TTL))
+            backend = MemoryBackend(
+                max_entries=int(os.getenv('FORMS_CACHE_MAX_ENTRIES', 1024)),
+                ttl=ttl
+            )
+            logger.warning(
+                f"FORMS_CACHE_URL is not set: the form cache is per process, other workers "
+                f"may serve a changed form for up to {ttl:.0f}s"
+            )
+    form_cache = FormCache(backend)
+    logger.info(f"Form cache created with {type(backend).__name__}")
+
+async def close_form_cache():
+    global form_cache
+    if form_cache:
+        await form_cache.backend.close()
+        form_cache = None
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
@@ -1,3 +1,4 @@
+import asyncio
 import asyncpg
 from asyncpg.pool import Pool
 from contextlib import asynccontextmanager
@@ -5,77 +6,185 @@ import logging
 from typing import Optional
 import os
 from dotenv import load_dotenv
+import time
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from .cache import create_form_cache, close_form_cache
+from . import auth, ingest, replicas
+from .admission import PoolExhausted
+from .metrics import POOL_ACQUIRE_LATENCY, POOL_IDLE, POOL_MAX_SIZE, POOL_SIZE
+from .profiling import create_profiler, stop_profiler
+from .queries import FormsConnection, init_connection
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+ALEMBIC_CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+# Failures caused by the rows written; ValueError covers asyncpg's client-side
+# encoding errors. Anything else (a lost connection, an exhausted pool, a
+# failover) says nothing about the rows and is worth retrying unchanged.
+DATA_ERRORS = (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError, ValueError)
+
 db_pool: Optional[Pool] = None
+# Seconds a request may wait for a free connection before it fails with 503.
+acquire_timeout = float(os.getenv('DB_ACQUIRE_TIMEOUT', 2))
+replica_set: Optional[replicas.ReplicaSet] = None
 
-async def create_db_pool():
-    global db_pool
-    db_pool = await asyncpg.create_pool(
+POOL_SIZE.set_function(lambda: db_pool.get_size() if db_pool else 0)
+POOL_IDLE.set_function(lambda: db_pool.get_idle_size() if db_pool else 0)
+POOL_MAX_SIZE.set_function(lambda: db_pool.get_max_size() if db_pool else 0)
+
+def connection_settings():
+    return dict(
         user=os.getenv('POSTGRES_USER'),
         password=os.getenv('POSTGRES_PASSWORD'),
         host=os.getenv('POSTGRES_HOST'),
         port=os.getenv('POSTGRES_PORT'),
         database=os.getenv('POSTGRES_DB'),
+    )
+
+def pool_settings():
+    return dict(
+        **connection_settings(),
         min_size=int(os.getenv('DB_POOL_MIN_SIZE', 1)),
         max_size=int(os.getenv('DB_POOL_MAX_SIZE', 10)),
-        timeout=int(os.getenv('DB_POOL_TIMEOUT', 30))
+        timeout=int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        statement_cache_size=int(os.getenv('DB_STATEMENT_CACHE_SIZE', 100)),
+        max_inactive_connection_lifetime=float(os.getenv('DB_MAX_INACTIVE_CONNECTION_LIFETIME', 300)),
+        connection_class=FormsConnection,
+        init=init_connection
     )
+
+async def create_db_pool():
+    global db_pool, replica_set
+    # min_size connections are opened and initialized up front, so an invalid
+    # statement in the registry fails the startup instead of the first request.
+    db_pool = await asyncpg.create_pool(**pool_settings())
     logger.info("Database connection pool created successfully")
+    replica_set = await replicas.create_replica_set(pool_settings())
 
 async def close_db_pool():
-    global db_pool
+    global db_pool, replica_set
+    if replica_set:
+        await replica_set.close()
+        replica_set = None
     if db_pool:
         await db_pool.close()
         logger.info("Database connection pool closed")
 
-async def create_tables(conn):
-    await conn.execute("""
-    CREATE TABLE IF NOT EXISTS forms (
-        id SERIAL PRIMARY KEY,
-        title TEXT NOT NULL,
-        description TEXT,
-        created_at TIMESTAMP DEFAULT NOW()
-    )
-    """)
-    
-    await conn.execute("""
-    CREATE TABLE IF NOT EXISTS questions (
-        id SERIAL PRIMARY KEY,
-        form_id INTEGER REFERENCES forms(id) ON DELETE CASCADE,
-        question_id TEXT NOT NULL,
-        title TEXT NOT NULL,
-        type TEXT NOT NULL,
-        required BOOLEAN NOT NULL DEFAULT FALSE,
-        options JSONB,
-        min_value INTEGER,
-        max_value INTEGER,
-        min_label TEXT,
-        max_label TEXT
-    )
-    """)
-    logger.info("Database tables created/verified")
+def migration_scripts() -> ScriptDirectory:
+    return ScriptDirectory.from_config(Config(ALEMBIC_CONFIG))
+
+async def check_schema(conn, scripts: Optional[ScriptDirectory] = None):
+    """Refuses to start against a database behind the head of ``migrations/``.
+
+    The schema is owned by the Alembic migrations; the service itself never
+    runs DDL. A revision this build does not know comes from a newer build,
+    which happens while rolling back, and is accepted: migrations only add
+    to the schema, so older code keeps working on it.
+    """
+    scripts = scripts or migration_scripts()
+    head = scripts.get_current_head()
+    try:
+        current = await conn.fetchval("SELECT version_num FROM alembic_version")
+    except asyncpg.UndefinedTableError:
+        current = None
+    if current == head:
+        logger.info(f"Database schema is at revision {current}")
+        return
+    known = {script.revision for script in scripts.walk_revisions()}
+    if current is None or current in known:
+        raise RuntimeError(
+            f"Database schema is at revision {current}, expected {head}; "
+            "run `alembic upgrade head`"
+        )
+    logger.warning(f"Database schema is at revision {current}, newer than this build's {head}")
 
 @asynccontextmanager
 async def lifespan(app):
     try:
+        auth.check_secret()
+        conn = await asyncpg.connect(**connection_settings())
+        try:
+            await check_schema(conn)
+        finally:
+            await conn.close()
         await create_db_pool()
-        async with db_pool.acquire() as conn:
-            await create_tables(conn)
+        create_form_cache()
+        create_profiler()
+        ingest.start_submission_writer()
         yield
     except Exception as e:
         logger.error(f"Error during startup: {str(e)}")
         raise
     finally:
+        await ingest.stop_submission_writer()
+        stop_profiler()
+        await close_form_cache()
         await close_db_pool()
 
-async def get_db():
+@asynccontextmanager
+async def acquire():
     if not db_pool:
         raise RuntimeError("Database connection not available")
-    async with db_pool.acquire() as connection:
+    start = time.perf_counter()
+    try:
+        connection = await db_pool.acquire(timeout=acquire_timeout)
+    except (asyncio.TimeoutError, asyncpg.TooManyConnectionsError):
+        raise PoolExhausted()
+    finally:
+        POOL_ACQUIRE_LATENCY.observe(time.perf_counter() - start)
+    try:
+        yield connection
+    finally:
+        await db_pool.release(connection)
+
+@asynccontextmanager
+async def acquire_read():
+    """Acquires a connection for read-only work, from a healthy replica when there is one.
+
+    Falls back to the primary when no replica is configured or healthy, when the
+    client wrote recently (see replicas.read_your_writes_middleware) or when the
+    chosen replica cannot hand out a connection.
+    """
+    replica = None
+    if replica_set is None:
+        reason = "no_replicas"
+    elif replicas.primary_pinned.get():
+        reason = "read_your_writes"
+    else:
+        replica = replica_set.choose()
+        reason = "replica" if replica else "no_healthy_replica"
+
+    connection = None
+    if replica is not None:
+        try:
+            connection = await replica.pool.acquire(timeout=acquire_timeout)
+        except Exception as e:
+            logger.error(f"Replica {replica.name} unavailable: {str(e)}")
+            replica.mark(False)
+            reason = "replica_failed"
+
+    if connection is None:
+        replicas.DB_ROUTED.labels("primary", reason).inc()
+        async with acquire() as primary_connection:
+            yield primary_connection
+        return
+
+    replicas.DB_ROUTED.labels("replica", reason).inc()
+    try:
+        yield connection
+    finally:
+        await replica.pool.release(connection)
+
+async def get_read_db():
+    async with acquire_read() as connection:
+        yield connection
+
+async def get_db():
+    async with acquire() as connection:
         try:
             yield connection
         except Exception as e:
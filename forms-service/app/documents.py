@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from . import cache, database
+from .cache import CachedForm
+from .queries import BUILD_DOCUMENT_SQL
+
+logger = logging.getLogger(__name__)
+
+async def refresh_documents(conn, form_ids: List[int]):
+    """Rebuilds stored documents; must run in the transaction that wrote the rows."""
+    rows = await conn.statements["refresh_documents"].fetch(form_ids)
+    return {row["id"]: row["document"].encode() for row in rows}
+
+async def fetch_document(conn, form_id: int) -> Optional[bytes]:
+    document = await conn.statements["fetch_document"].fetchval(form_id)
+    return document.encode() if document is not None else None
+
+async def load_document(form_id: int) -> Tuple[int, CachedForm]:
+    """Returns the form's cache version and its document, read through the form cache.
+
+    Misses are filled from the primary: a lagging replica could return the
+    document as it was before the write that bumped ``version``, and the cache
+    would then serve that old copy under the new version until it expires.
+    """
+    version = await cache.form_cache.version(form_id)
+    cached = await cache.form_cache.get(form_id, version)
+    if cached is None:
+        async with database.acquire() as conn:
+            document = await fetch_document(conn, form_id)
+        if document is None:
+            raise HTTPException(status_code=404, detail="Form not found")
+        cached = await cache.form_cache.put(form_id, version, document)
+    return version, cached
+
+async def backfill(conn, batch_size: int = 500, only_missing: bool = True):
+    last_id, total = 0, 0
+    condition = "AND document IS NULL" if only_missing else ""
+    while True:
+        ids = await conn.fetch(
+            f"SELECT id FROM forms WHERE id > $1 {condition} ORDER BY id LIMIT $2",
+            last_id, batch_size
+        )
+        if not ids:
+            return total
+        async with conn.transaction():
+            await refresh_documents(conn, [row["id"] for row in ids])
+        last_id = ids[-1]["id"]
+        total += len(ids)
+        logger.info(f"Backfilled {total} form documents")
+
+async def find_inconsistent(conn) -> List[int]:
+    rows = await conn.fetch(
+        f"""
+        SELECT f.id FROM forms f
+        WHERE f.document IS DISTINCT FROM {BUILD_DOCUMENT_SQL}
+        ORDER BY f.id
+        """
+    )
+    return [row["id"] for row in rows]
+
+async def main(command: str, batch_size: int, rebuild_all: bool):
+    await database.create_db_pool()
+    try:
+        async with database.db_pool.acquire() as conn:
+            if command == "backfill":
+                total = await backfill(conn, batch_size, only_missing=not rebuild_all)
+                logger.info(f"Backfill finished: {total} forms updated")
+                return 0
+            inconsistent = await find_inconsistent(conn)
+            if inconsistent:
+                logger.error(f"{len(inconsistent)} forms have stale documents: {inconsistent[:100]}")
+                return 1
+            logger.info("All form documents match their questions")
+            return 0
+    finally:
+        await database.close_db_pool()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Maintain denormalized form documents")
+    parser.add_argument("command", choices=["backfill", "check"])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--all", dest="rebuild_all", action="store_true",
+                        help="rebuild every document, not only missing ones")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(main(args.command, args.batch_size, args.rebuild_all)))
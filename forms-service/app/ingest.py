@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import os
+from typing import List, NamedTuple, Optional
+from uuid import UUID
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from . import analytics, database
+from .validation import AnswerRow
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DEPTH = Gauge("forms_submission_queue_depth", "Accepted submissions waiting to be written")
+SUBMISSIONS_WRITTEN = Counter("forms_submissions_written_total", "Submissions flushed to Postgres")
+SUBMISSIONS_REJECTED = Counter("forms_submissions_rejected_total", "Submissions refused because the queue was full")
+SUBMISSIONS_DROPPED = Counter("forms_submissions_dropped_total", "Submissions lost after repeated flush failures")
+SUBMISSIONS_DISCARDED = Counter(
+    "forms_submissions_discarded_total", "Queued submissions whose form was deleted before the flush"
+)
+FLUSH_SIZE = Histogram(
+    "forms_submission_flush_size",
+    "Submissions per flush",
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 2500, 5000)
+)
+
+MAX_RETRY_DELAY = 30
+
+SUBMISSION_COLUMNS = ("id", "form_id", "form_version", "submitted_at")
+ANSWER_COLUMNS = ("submission_id", "form_id", "question_id", "option_id", "value_int", "value_text")
+
+class Submission(NamedTuple):
+    id: UUID
+    form_id: int
+    form_version: int
+    submitted_at: object
+    answers: List[AnswerRow]
+
+class QueueFull(Exception):
+    pass
+
+class SubmissionWriter:
+    """Write-behind buffer for submissions.
+
+    Accepted submissions are queued in memory and copied to Postgres in batches
+    once ``batch_size`` is reached or ``flush_interval`` seconds have passed,
+    whichever comes first. A full queue rejects new submissions instead of
+    growing without bound; ``stop`` drains whatever is still queued.
+    """
+
+    def __init__(self, max_queue: int = 10000, batch_size: int = 500,
+                 flush_interval: float = 0.5, max_retries: int = 3):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self._queue: "asyncio.Queue[Submission]" = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        QUEUE_DEPTH.set_function(self._queue.qsize)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def submit(self, submission: Submission):
+        if self._closing:
+            raise QueueFull()
+        try:
+            self._queue.put_nowait(submission)
+        except asyncio.QueueFull:
+            SUBMISSIONS_REJECTED.inc()
+            raise QueueFull()
+
+    async def stop(self):
+        self._closing = True
+        if self._task:
+            await self._queue.join()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        logger.info("Submission writer drained")
+
+    async def _next_batch(self) -> List[Submission]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: List[Submission]):
+        """Writes ``batch``, retrying until the database takes it.
+
+        Connection and pool failures retry the whole batch with growing delays
+        for as long as they last; meanwhile the queue fills up and new
+        submissions are refused. Only a writer that is stopping gives up, after
+        ``max_retries`` attempts. A batch rejected for its data is split in
+        halves that are flushed on their own, so one bad submission costs only
+        itself and never the accepted submissions of other forms.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                await self._write(batch)
+                return
+            except database.DATA_ERRORS as e:
+                logger.error(f"Postgres rejected {len(batch)} submissions: {str(e)}")
+                break
+            except Exception as e:
+                logger.error(f"Failed to flush {len(batch)} submissions (attempt {attempt}): {str(e)}")
+                if self._closing and attempt >= self.max_retries:
+                    SUBMISSIONS_DROPPED.inc(len(batch))
+                    logger.error(f"Dropped {len(batch)} submissions while stopping")
+                    return
+                await asyncio.sleep(min(0.5 * 2 ** (attempt - 1), MAX_RETRY_DELAY))
+        if len(batch) == 1:
+            SUBMISSIONS_DROPPED.inc()
+            logger.error(f"Dropped submission {batch[0].id} of form {batch[0].form_id}")
+            return
+        middle = len(batch) // 2
+        await self._flush(batch[:middle])
+        await self._flush(batch[middle:])
+
+    async def _write(self, batch: List[Submission]):
+        async with database.acquire() as conn:
+            async with conn.transaction():
+                # Forms deleted while their submissions were queued would fail
+                # the foreign keys of the whole COPY. The key-share locks also
+                # keep the remaining forms from being deleted until commit.
+                form_ids = sorted({s.form_id for s in batch})
+                existing = {row["id"] for row in await conn.statements["lock_forms"].fetch(form_ids)}
+                kept = [s for s in batch if s.form_id in existing]
+                if len(kept) < len(batch):
+                    SUBMISSIONS_DISCARDED.inc(len(batch) - len(kept))
+                    logger.info(f"Discarded {len(batch) - len(kept)} submissions of deleted forms")
+                if not kept:
+                    return
+                await conn.copy_records_to_table(
+                    "submissions",
+                    records=[(s.id, s.form_id, s.form_version, s.submitted_at) for s in kept],
+                    columns=SUBMISSION_COLUMNS
+                )
+                answers = [
+                    (s.id, s.form_id, question_id, option_id, value_int, value_text)
+                    for s in kept
+                    for question_id, option_id, value_int, value_text in s.answers
+                ]
+                if answers:
+                    await conn.copy_records_to_table("answers", records=answers, columns=ANSWER_COLUMNS)
+                await analytics.apply_increments(conn, kept)
+        SUBMISSIONS_WRITTEN.inc(len(kept))
+        FLUSH_SIZE.observe(len(kept))
+
+submission_writer: Optional[SubmissionWriter] = None
+
+def start_submission_writer():
+    global submission_writer
+    submission_writer = SubmissionWriter(
+        max_queue=int(os.getenv('SUBMISSION_QUEUE_SIZE', 10000)),
+        batch_size=int(os.getenv('SUBMISSION_BATCH_SIZE', 500)),
+        flush_interval=float(os.getenv('SUBMISSION_FLUSH_INTERVAL', 0.5))
+    )
+    submission_writer.start()
+
+async def stop_submission_writer():
+    global submission_writer
+    if submission_writer:
+        await submission_writer.stop()
+        submission_writer = None
@@ -1,8 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import logging
+from .admission import admission_middleware
 from .database import lifespan
-from .routers import forms
+from .metrics import metrics_endpoint, metrics_middleware
+from .profiling import profiling_middleware
+from .replicas import read_your_writes_middleware
+from .responses import FastJSONResponse
+from .routers import forms, search, submissions, transfer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,15 +20,31 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=FastJSONResponse,
     lifespan=lifespan
 )
 
+# Registered first: their static /export, /import and /search paths would
+# otherwise be captured by /{form_id}.
+app.include_router(transfer.router, prefix="/forms")
+app.include_router(search.router, prefix="/forms")
+app.include_router(forms.router, prefix="/forms")
+app.include_router(submissions.router, prefix="/forms")
+
+app.middleware("http")(read_your_writes_middleware)
+app.middleware("http")(profiling_middleware)
+app.middleware("http")(admission_middleware)
+app.middleware("http")(metrics_middleware)
+# Added last, so it is outermost: shed 429/503 responses carry the CORS
+# headers too, and preflights never reach the rate limiter.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost", "http://localhost:3000"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cross-origin clients page through GET /forms/forms/ and /forms/forms/search
+    # with X-Next-Cursor and back off on Retry-After.
+    expose_headers=["X-Next-Cursor", "Retry-After"],
 )
-
-app.include_router(forms.router, prefix="/forms")
\ No newline at end of file
+app.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
@@ -0,0 +1,45 @@
+import time
+
+from fastapi import Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST, Gauge, Histogram, generate_latest
+
+REQUEST_LATENCY = Histogram(
+    "forms_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"]
+)
+REQUESTS_IN_FLIGHT = Gauge("forms_http_requests_in_flight", "HTTP requests being served")
+QUERY_LATENCY = Histogram(
+    "forms_db_query_duration_seconds",
+    "Duration of registered statements",
+    ["statement"]
+)
+POOL_ACQUIRE_LATENCY = Histogram(
+    "forms_db_pool_acquire_seconds",
+    "Time spent waiting for a pooled connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30)
+)
+POOL_SIZE = Gauge("forms_db_pool_size", "Open connections in the pool")
+POOL_IDLE = Gauge("forms_db_pool_idle", "Idle connections in the pool")
+POOL_MAX_SIZE = Gauge("forms_db_pool_max_size", "Configured pool capacity")
+
+def route_label(request: Request) -> str:
+    route = request.scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+async def metrics_middleware(request: Request, call_next):
+    REQUESTS_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        REQUESTS_IN_FLIGHT.dec()
+        REQUEST_LATENCY.labels(request.method, route_label(request), status).observe(
+            time.perf_counter() - start
+        )
+
+async def metrics_endpoint():
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List
+
+from . import database
+from .queries import QUERIES
+from .serialization import loads
+
+logger = logging.getLogger(__name__)
+
+# Hot statements of the registry with representative arguments. Planned with
+# sequential scans disabled, any Seq Scan left on a large table means no index
+# can serve the query, whatever the size of the database the check runs on.
+HOT_QUERIES = {
+    "list_forms": (50,),
+    "list_forms_after": (datetime.now(), 1, 50),
+    "fetch_questions": ([1, 2, 3],),
+    "lock_questions": (1,),
+    "fetch_document": (1,),
+    "refresh_documents": ([1],),
+    "delete_form_questions": (1,),
+    "submission_count": (1,),
+    "option_counts": (1,),
+    "scale_counts": (1,),
+    "search_forms": ("анкета survey", None, None, 50),
+}
+
+INDEXED_TABLES = {
+    "forms", "questions", "submissions", "answers",
+    "form_submission_counts", "question_option_counts", "question_scale_counts",
+}
+
+def seq_scans(plan: dict) -> List[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in INDEXED_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+async def explain(conn, sql: str, args: tuple) -> dict:
+    raw = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {sql}", *args)
+    return (loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+
+async def check_plans(conn) -> Dict[str, List[str]]:
+    """Returns the hot queries that scan a table sequentially, with the scanned tables."""
+    regressions = {}
+    # EXPLAIN of data-modifying statements does not execute them, the
+    # transaction only scopes the planner setting.
+    async with conn.transaction():
+        await conn.execute("SET LOCAL enable_seqscan = off")
+        for name, args in HOT_QUERIES.items():
+            scans = seq_scans(await explain(conn, QUERIES[name], args))
+            if scans:
+                regressions[name] = scans
+    return regressions
+
+async def main():
+    await database.create_db_pool()
+    try:
+        async with database.acquire() as conn:
+            regressions = await check_plans(conn)
+    finally:
+        await database.close_db_pool()
+    for name, tables in regressions.items():
+        logger.error(f"{name} scans {', '.join(tables)} sequentially")
+    if regressions:
+        return 1
+    logger.info(f"All {len(HOT_QUERIES)} hot queries use indexes")
+    return 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    argparse.ArgumentParser(description="Fail if hot queries stop using indexes").parse_args()
+    raise SystemExit(asyncio.run(main()))
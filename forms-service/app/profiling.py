@@ -0,0 +1,101 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+class SlowRequestProfiler:
+    """Samples the event loop thread and dumps collapsed stacks of slow requests.
+
+    Requests share the loop, so a dump holds everything the loop ran while the
+    slow request was in flight, not only that request's own frames. The output
+    is in the folded format read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, threshold_ms: float, output_dir: str, interval: float = 0.005,
+                 max_samples: int = 20000):
+        self.threshold = threshold_ms / 1000
+        self.output_dir = output_dir
+        self.interval = interval
+        self._samples = deque(maxlen=max_samples)
+        self._thread_id: Optional[int] = None
+        self._stopped = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._thread_id = threading.get_ident()
+        self._sampler = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+        self._sampler.start()
+        logger.info(f"Profiling requests slower than {self.threshold * 1000:.0f} ms into {self.output_dir}")
+
+    def stop(self):
+        self._stopped.set()
+        if self._sampler:
+            self._sampler.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                self._samples.append((time.perf_counter(), self._collapse(frame)))
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+    @contextmanager
+    def track(self, label: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.threshold:
+                self._dump(label, start, elapsed)
+
+    def _dump(self, label: str, start: float, elapsed: float):
+        stacks = Counter(stack for ts, stack in list(self._samples) if ts >= start)
+        if not stacks:
+            return
+        safe_label = "".join(c if c.isalnum() else "_" for c in label).strip("_")
+        path = os.path.join(self.output_dir, f"{int(time.time() * 1000)}-{safe_label}.folded")
+        with open(path, "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        logger.warning(f"Slow request {label} took {elapsed * 1000:.0f} ms, stacks written to {path}")
+
+profiler: Optional[SlowRequestProfiler] = None
+
+def create_profiler():
+    global profiler
+    threshold = os.getenv('PROFILE_SLOW_REQUESTS_MS')
+    if threshold:
+        profiler = SlowRequestProfiler(
+            threshold_ms=float(threshold),
+            output_dir=os.getenv('PROFILE_OUTPUT_DIR', '/tmp/forms-profiles'),
+            interval=float(os.getenv('PROFILE_SAMPLE_INTERVAL', 0.005))
+        )
+        profiler.start()
+
+def stop_profiler():
+    global profiler
+    if profiler:
+        profiler.stop()
+        profiler = None
+
+async def profiling_middleware(request, call_next):
+    if profiler is None:
+        return await call_next(request)
+    with profiler.track(f"{request.method} {request.url.path}"):
+        return await call_next(request)
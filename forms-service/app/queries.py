@@ -0,0 +1,226 @@
+import time
+
+import asyncpg
+
+from .metrics import QUERY_LATENCY
+from .serialization import dumps, loads
+
+QUESTION_COLUMNS = """
+    question_id as id,
+    title,
+    type,
+    required,
+    options,
+    min_value,
+    max_value,
+    min_label,
+    max_label
+"""
+
+# Builds the FormResponse-shaped document of the form aliased as ``f``
+# from the normalized rows.
+BUILD_DOCUMENT_SQL = """
+    jsonb_build_object(
+        'id', f.id,
+        'title', f.title,
+        'description', f.description,
+        'version', f.version,
+        'questions', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'id', q.question_id,
+                'title', q.title,
+                'type', q.type,
+                'required', q.required,
+                'options', q.options,
+                'min_value', q.min_value,
+                'max_value', q.max_value,
+                'min_label', q.min_label,
+                'max_label', q.max_label
+            ) ORDER BY q.position, q.id)
+            FROM questions q WHERE q.form_id = f.id
+        ), '[]'::jsonb)
+    )
+"""
+
+HIGHLIGHT_OPTIONS = "StartSel=<mark>, StopSel=</mark>"
+
+# Ranks every match but builds highlights only for the rows of the page.
+SEARCH_SQL = f"""
+    SELECT p.id, p.title, p.description, p.rank,
+        ts_headline('forms_search', p.title, p.query, 'HighlightAll=true, {HIGHLIGHT_OPTIONS}') AS title_highlight,
+        CASE WHEN p.description IS NOT NULL THEN ts_headline(
+            'forms_search', p.description, p.query,
+            'MaxFragments=2, MaxWords=20, MinWords=5, {HIGHLIGHT_OPTIONS}'
+        ) END AS description_highlight,
+        ARRAY(
+            SELECT ts_headline('forms_search', q.title, p.query, 'HighlightAll=true, {HIGHLIGHT_OPTIONS}')
+            FROM jsonb_to_recordset(COALESCE(p.document->'questions', '[]'::jsonb)) AS q(title text)
+            WHERE to_tsvector('forms_search', q.title) @@ p.query
+            LIMIT 3
+        ) AS question_highlights
+    FROM (
+        SELECT * FROM (
+            SELECT f.id, f.title, f.description, f.document,
+                   ts_rank_cd(f.search_vector, query) AS rank, query
+            FROM forms f, websearch_to_tsquery('forms_search', $1) query
+            WHERE f.search_vector @@ query
+        ) matches
+        WHERE $2::real IS NULL OR (matches.rank, matches.id) < ($2::real, $3::int)
+        ORDER BY matches.rank DESC, matches.id DESC
+        LIMIT $4
+    ) p
+    ORDER BY p.rank DESC, p.id DESC
+"""
+
+# Every static statement of the service. Each pooled connection prepares all of
+# them once in FormsConnection.prepare_statements, so request handlers never
+# pay for parsing and planning, and a broken query fails the startup.
+QUERIES = {
+    "insert_form": """
+        INSERT INTO forms (title, description) VALUES ($1, $2) RETURNING id
+    """,
+    "update_form": """
+        UPDATE forms SET
+            title = COALESCE($2, title),
+            description = CASE WHEN $4 THEN $3 ELSE description END,
+            version = version + 1
+        WHERE id = $1 AND ($5::int IS NULL OR version = $5)
+        RETURNING id
+    """,
+    "form_version": "SELECT version FROM forms WHERE id = $1",
+    "delete_form": "DELETE FROM forms WHERE id = $1 RETURNING id",
+    "list_forms": """
+        SELECT id, title, description, version, created_at FROM forms
+        ORDER BY created_at DESC, id DESC
+        LIMIT $1
+    """,
+    "list_forms_after": """
+        SELECT id, title, description, version, created_at FROM forms
+        WHERE (created_at, id) < ($1, $2)
+        ORDER BY created_at DESC, id DESC
+        LIMIT $3
+    """,
+    "insert_questions": """
+        INSERT INTO questions (
+            form_id, question_id, title, type, required,
+            options, min_value, max_value, min_label, max_label, position
+        )
+        SELECT * FROM unnest(
+            $1::int[], $2::text[], $3::text[], $4::text[], $5::bool[], $6::jsonb[],
+            $7::int[], $8::int[], $9::text[], $10::text[], $11::int[]
+        )
+    """,
+    "update_questions": """
+        UPDATE questions q SET
+            title = u.title, type = u.type, required = u.required,
+            options = u.options, min_value = u.min_value, max_value = u.max_value,
+            min_label = u.min_label, max_label = u.max_label, position = u.position
+        FROM unnest(
+            $1::int[], $2::text[], $3::text[], $4::bool[], $5::jsonb[],
+            $6::int[], $7::int[], $8::text[], $9::text[], $10::int[]
+        ) AS u(id, title, type, required, options,
+               min_value, max_value, min_label, max_label, position)
+        WHERE q.id = u.id
+    """,
+    "lock_questions": f"""
+        SELECT questions.id AS row_id, position, {QUESTION_COLUMNS}
+        FROM questions WHERE form_id = $1
+        ORDER BY position, questions.id
+        FOR UPDATE
+    """,
+    "fetch_questions": f"""
+        SELECT form_id, {QUESTION_COLUMNS}
+        FROM questions WHERE form_id = ANY($1::int[])
+        ORDER BY form_id, position, questions.id
+    """,
+    "delete_form_questions": "DELETE FROM questions WHERE form_id = $1",
+    "delete_questions": "DELETE FROM questions WHERE id = ANY($1::int[])",
+    "refresh_documents": f"""
+        UPDATE forms f SET document = {BUILD_DOCUMENT_SQL}
+        WHERE f.id = ANY($1::int[])
+        RETURNING f.id, f.document::text AS document
+    """,
+    "allocate_form_ids": """
+        SELECT nextval(pg_get_serial_sequence('forms', 'id'))::int FROM generate_series(1, $1)
+    """,
+    "export_documents": f"""
+        SELECT COALESCE(f.document, {BUILD_DOCUMENT_SQL})::text FROM forms f ORDER BY f.id
+    """,
+    "fetch_document": f"""
+        SELECT COALESCE(f.document, {BUILD_DOCUMENT_SQL})::text FROM forms f WHERE f.id = $1
+    """,
+    "lock_forms": """
+        SELECT id FROM forms WHERE id = ANY($1::int[]) ORDER BY id FOR KEY SHARE
+    """,
+    "lock_analytics_shared": """
+        SELECT pg_advisory_xact_lock_shared($1::int, id) FROM unnest($2::int[]) AS id
+    """,
+    "increment_submission_counts": """
+        INSERT INTO form_submission_counts (form_id, count)
+        SELECT * FROM unnest($1::int[], $2::bigint[])
+        ON CONFLICT (form_id) DO UPDATE
+        SET count = form_submission_counts.count + EXCLUDED.count
+    """,
+    "increment_option_counts": """
+        INSERT INTO question_option_counts (form_id, question_id, option_id, count)
+        SELECT * FROM unnest($1::int[], $2::text[], $3::text[], $4::bigint[])
+        ON CONFLICT (form_id, question_id, option_id) DO UPDATE
+        SET count = question_option_counts.count + EXCLUDED.count
+    """,
+    "increment_scale_counts": """
+        INSERT INTO question_scale_counts (form_id, question_id, value, count)
+        SELECT * FROM unnest($1::int[], $2::text[], $3::int[], $4::bigint[])
+        ON CONFLICT (form_id, question_id, value) DO UPDATE
+        SET count = question_scale_counts.count + EXCLUDED.count
+    """,
+    "search_forms": SEARCH_SQL,
+    "submission_count": "SELECT count FROM form_submission_counts WHERE form_id = $1",
+    "option_counts": """
+        SELECT question_id, option_id, count FROM question_option_counts WHERE form_id = $1
+    """,
+    "scale_counts": """
+        SELECT question_id, value, count FROM question_scale_counts WHERE form_id = $1
+    """,
+}
+
+class TimedStatement:
+    """Prepared statement wrapper that records its duration under its registry name."""
+
+    __slots__ = ("statement", "histogram")
+
+    def __init__(self, name: str, statement):
+        self.statement = statement
+        self.histogram = QUERY_LATENCY.labels(name)
+
+    async def _timed(self, method, args):
+        start = time.perf_counter()
+        try:
+            return await method(*args)
+        finally:
+            self.histogram.observe(time.perf_counter() - start)
+
+    async def fetch(self, *args):
+        return await self._timed(self.statement.fetch, args)
+
+    async def fetchrow(self, *args):
+        return await self._timed(self.statement.fetchrow, args)
+
+    async def fetchval(self, *args):
+        return await self._timed(self.statement.fetchval, args)
+
+class FormsConnection(asyncpg.Connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.statements = {}
+
+    async def prepare_statements(self):
+        for codec in ("json", "jsonb"):
+            await self.set_type_codec(codec, encoder=dumps, decoder=loads, schema="pg_catalog")
+        for name, query in QUERIES.items():
+            try:
+                self.statements[name] = TimedStatement(name, await self.prepare(query))
+            except asyncpg.PostgresError as e:
+                raise RuntimeError(f"Failed to prepare statement {name}: {str(e)}") from e
+
+async def init_connection(conn: FormsConnection):
+    await conn.prepare_statements()
@@ -0,0 +1,124 @@
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from .schemas import FormQuestion
+
+def options_value(question: FormQuestion) -> Optional[list]:
+    if not question.options:
+        return None
+    return [opt.dict() for opt in question.options]
+
+def question_to_dict(q):
+    return {
+        "id": q["id"],
+        "title": q["title"],
+        "type": q["type"],
+        "required": q["required"],
+        "options": q["options"] or None,
+        "min_value": q["min_value"],
+        "max_value": q["max_value"],
+        "min_label": q["min_label"],
+        "max_label": q["max_label"]
+    }
+
+def check_unique_ids(questions: List[FormQuestion]):
+    seen = set()
+    for q in questions:
+        if q.id in seen:
+            raise HTTPException(status_code=400, detail=f"Duplicate question id: {q.id}")
+        seen.add(q.id)
+
+async def insert_questions(conn, form_id: int, questions: List[FormQuestion],
+                           positions: Optional[List[int]] = None):
+    if positions is None:
+        positions = list(range(len(questions)))
+    await insert_form_questions(conn, [(form_id, q, p) for q, p in zip(questions, positions)])
+
+async def insert_form_questions(conn, rows: List[Tuple[int, FormQuestion, int]]):
+    """Inserts (form_id, question, position) rows of any number of forms in one statement."""
+    if not rows:
+        return
+    await conn.statements["insert_questions"].fetch(
+        [form_id for form_id, _, _ in rows],
+        [q.id for _, q, _ in rows],
+        [q.title for _, q, _ in rows],
+        [q.type.value for _, q, _ in rows],
+        [q.required for _, q, _ in rows],
+        [options_value(q) for _, q, _ in rows],
+        [q.min_value for _, q, _ in rows],
+        [q.max_value for _, q, _ in rows],
+        [q.min_label for _, q, _ in rows],
+        [q.max_label for _, q, _ in rows],
+        [position for _, _, position in rows]
+    )
+
+async def update_questions(conn, row_ids: List[int], questions: List[FormQuestion],
+                           positions: List[int]):
+    if not questions:
+        return
+    await conn.statements["update_questions"].fetch(
+        row_ids,
+        [q.title for q in questions],
+        [q.type.value for q in questions],
+        [q.required for q in questions],
+        [options_value(q) for q in questions],
+        [q.min_value for q in questions],
+        [q.max_value for q in questions],
+        [q.min_label for q in questions],
+        [q.max_label for q in questions],
+        positions
+    )
+
+def _is_unchanged(row, question: FormQuestion, position: int) -> bool:
+    stored = question_to_dict(row)
+    incoming = question.dict()
+    incoming["type"] = question.type.value
+    return row["position"] == position and all(
+        stored[key] == incoming[key] for key in stored if key != "id"
+    )
+
+async def sync_questions(conn, form_id: int, questions: List[FormQuestion]) -> Dict[str, int]:
+    """Brings stored questions in line with ``questions``, matching rows by question id.
+
+    Only changed rows are written, each kind of change with one bulk statement,
+    so row ids of untouched questions stay stable.
+    """
+    check_unique_ids(questions)
+    rows = await conn.statements["lock_questions"].fetch(form_id)
+    stored = {}
+    incoming_ids = {q.id for q in questions}
+
+    to_delete = []
+    for row in rows:
+        # Forms saved before ids were checked may repeat one; the extra rows go.
+        if row["id"] not in incoming_ids or row["id"] in stored:
+            to_delete.append(row["row_id"])
+        else:
+            stored[row["id"]] = row
+    to_insert, insert_positions = [], []
+    to_update, update_row_ids, update_positions = [], [], []
+    for position, question in enumerate(questions):
+        row = stored.get(question.id)
+        if row is None:
+            to_insert.append(question)
+            insert_positions.append(position)
+        elif not _is_unchanged(row, question, position):
+            to_update.append(question)
+            update_row_ids.append(row["row_id"])
+            update_positions.append(position)
+
+    if to_delete:
+        await conn.statements["delete_questions"].fetch(to_delete)
+    await update_questions(conn, update_row_ids, to_update, update_positions)
+    await insert_questions(conn, form_id, to_insert, insert_positions)
+    return {"inserted": len(to_insert), "updated": len(to_update), "deleted": len(to_delete)}
+
+async def fetch_questions(conn, form_ids: List[int]):
+    if not form_ids:
+        return {}
+    rows = await conn.statements["fetch_questions"].fetch(form_ids)
+    grouped = {}
+    for q in rows:
+        grouped.setdefault(q["form_id"], []).append(question_to_dict(q))
+    return grouped
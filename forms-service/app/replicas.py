@@ -0,0 +1,134 @@
+import asyncio
+import itertools
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+
+import asyncpg
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+DB_ROUTED = Counter("forms_db_routed_total", "Connections handed out by target", ["target", "reason"])
+REPLICA_HEALTHY = Gauge("forms_db_replica_healthy", "1 if the replica takes reads", ["replica"])
+
+STICKY_COOKIE = "forms_primary_until"
+
+# Set per request when the client wrote recently and must read its own writes.
+primary_pinned: ContextVar[bool] = ContextVar("primary_pinned", default=False)
+
+# The last replayed transaction only dates the lag while WAL is still pending:
+# on an idle primary nothing new arrives and now() - replay time keeps growing.
+REPLICATION_LAG_SQL = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+class Replica:
+    def __init__(self, host: str, port: Optional[str], pool_settings: dict):
+        self.name = f"{host}:{port}" if port else host
+        self.host = host
+        self.port = port
+        self.pool_settings = pool_settings
+        self.pool: Optional[asyncpg.Pool] = None
+        self.healthy = False
+
+    def mark(self, healthy: bool):
+        if healthy != self.healthy:
+            logger.warning(f"Replica {self.name} is now {'healthy' if healthy else 'unhealthy'}")
+        self.healthy = healthy
+        REPLICA_HEALTHY.labels(self.name).set(1 if healthy else 0)
+
+    async def check(self, timeout: float, max_lag: Optional[float]):
+        try:
+            if self.pool is None:
+                self.pool = await asyncpg.create_pool(
+                    **{**self.pool_settings, "host": self.host, "port": self.port or self.pool_settings.get("port")}
+                )
+            lag = await self.pool.fetchval(REPLICATION_LAG_SQL, timeout=timeout)
+            self.mark(max_lag is None or lag <= max_lag)
+        except Exception as e:
+            logger.error(f"Replica {self.name} health check failed: {str(e)}")
+            self.mark(False)
+
+    async def close(self):
+        if self.pool:
+            await self.pool.close()
+
+class ReplicaSet:
+    """Round-robin over the replicas that passed their last health check."""
+
+    def __init__(self, replicas: List[Replica], check_interval: float = 5,
+                 check_timeout: float = 2, max_lag: Optional[float] = None):
+        self.replicas = replicas
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self.max_lag = max_lag
+        self._cycle = itertools.cycle(replicas)
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        await self.check_all()
+        self._task = asyncio.create_task(self._monitor())
+
+    async def check_all(self):
+        await asyncio.gather(*(r.check(self.check_timeout, self.max_lag) for r in self.replicas))
+
+    async def _monitor(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check_all()
+
+    def choose(self) -> Optional[Replica]:
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if replica.healthy:
+                return replica
+        return None
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+        await asyncio.gather(*(r.close() for r in self.replicas))
+
+def parse_replica_hosts(value: str):
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        host, _, port = item.partition(":")
+        yield host, port or None
+
+async def create_replica_set(pool_settings: dict) -> Optional[ReplicaSet]:
+    hosts = os.getenv('POSTGRES_REPLICA_HOSTS')
+    if not hosts:
+        return None
+    max_lag = os.getenv('REPLICA_MAX_LAG_SECONDS')
+    replica_set = ReplicaSet(
+        [Replica(host, port, pool_settings) for host, port in parse_replica_hosts(hosts)],
+        check_interval=float(os.getenv('REPLICA_CHECK_INTERVAL', 5)),
+        max_lag=float(max_lag) if max_lag else None
+    )
+    await replica_set.start()
+    logger.info(f"Read replicas: {', '.join(r.name for r in replica_set.replicas)}")
+    return replica_set
+
+async def read_your_writes_middleware(request, call_next):
+    pinned_until = request.cookies.get(STICKY_COOKIE)
+    try:
+        pinned = pinned_until is not None and float(pinned_until) > time.time()
+    except ValueError:
+        pinned = False
+    token = primary_pinned.set(pinned)
+    try:
+        response = await call_next(request)
+    finally:
+        primary_pinned.reset(token)
+    # 202 means the write was only queued (POST /forms/{id}/submissions): the
+    # primary has nothing newer than the replicas yet, so pinning buys nothing.
+    wrote = response.status_code < 400 and response.status_code != 202
+    if request.method not in ("GET", "HEAD", "OPTIONS") and wrote:
+        sticky = float(os.getenv('REPLICA_STICKY_SECONDS', 5))
+        response.set_cookie(STICKY_COOKIE, str(time.time() + sticky), max_age=int(sticky) + 1, httponly=True)
+    return response
@@ -0,0 +1,79 @@
+import gzip
+import os
+from typing import Dict, Optional
+
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import Counter
+
+from .serialization import dumps_response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+RESPONSE_BYTES = Counter("forms_response_body_bytes_total", "JSON body bytes sent by content encoding", ["encoding"])
+
+MIN_COMPRESS_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', 1024))
+GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 5))
+
+# Server preference when the client weighs several encodings equally.
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson instead of the standard library encoder."""
+
+    def render(self, content) -> bytes:
+        return dumps_response(content)
+
+def negotiate(accept_encoding: Optional[str], size: int) -> Optional[str]:
+    """Picks the content encoding for a body of ``size`` bytes, None for identity."""
+    if not accept_encoding or size < MIN_COMPRESS_BYTES:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                continue
+        weights[name.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        compressed = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        # mtime=0 keeps the output, and so the cached bytes, deterministic.
+        compressed = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    return compressed
+
+def variant_etag(etag: str, encoding: Optional[str]) -> str:
+    # Each encoding is its own representation and needs its own strong ETag.
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+def json_response(body: bytes, accept_encoding: Optional[str],
+                  headers: Optional[Dict[str, str]] = None, encoding: Optional[str] = None) -> Response:
+    """Response for already serialized JSON, compressed as the client accepts.
+
+    Pass ``encoding`` when ``body`` is already encoded, e.g. read from the form cache.
+    """
+    headers = dict(headers or {})
+    headers["Vary"] = "Accept-Encoding"
+    if encoding is None:
+        encoding = negotiate(accept_encoding, len(body))
+        if encoding is not None:
+            body = compress(body, encoding)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    RESPONSE_BYTES.labels(encoding or "identity").inc(len(body))
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,141 +1,177 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
 import asyncpg
-import json
-from typing import List
-from ..schemas import FormCreate, FormResponse
-from ..database import get_db
+from typing import List, Optional, Union
+from ..schemas import FormCreate, FormPatch, FormResponse, FormSummary, FormUpdate
+from .. import cache
+from ..auth import require_user
+from ..database import get_db, get_read_db
+from ..documents import load_document, refresh_documents
+from ..questions import fetch_questions, insert_questions, sync_questions
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, encode_cursor, decode_cursor
+from ..responses import compress, json_response, negotiate, variant_etag
+from ..serialization import dumps_bytes
 
 router = APIRouter(prefix="/forms", tags=["forms"])
 
-@router.post("/", response_model=FormResponse, summary="Создать новую форму")
+@router.post("/", response_model=FormResponse, summary="Создать новую форму", dependencies=[Depends(require_user)])
 async def create_form(form: FormCreate, conn=Depends(get_db)):
     try:
         async with conn.transaction():
-            form_id = await conn.fetchval(
-                "INSERT INTO forms (title, description) VALUES ($1, $2) RETURNING id",
-                form.title, form.description
-            )
-            
-            for question in form.questions:
-                options_json = None
-                if question.options:
-                    options_json = json.dumps([opt.dict() for opt in question.options])
-                
-                await conn.execute(
-                    """
-                    INSERT INTO questions (
-                        form_id, question_id, title, type, required,
-                        options, min_value, max_value, min_label, max_label
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
-                    """,
-                    form_id, question.id, question.title, question.type.value,
-                    question.required, options_json,
-                    question.min_value, question.max_value, 
-                    question.min_label, question.max_label
-                )
+            form_id = await conn.statements["insert_form"].fetchval(form.title, form.description)
             
-            return await get_form_response(conn, form_id)
+            await insert_questions(conn, form_id, form.questions)
+            documents = await refresh_documents(conn, [form_id])
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to create form: {str(e)}")
+    return Response(content=documents[form_id], media_type="application/json")
 
-@router.get("/", response_model=List[FormResponse], summary="Получить все формы")
-async def get_forms(conn=Depends(get_db)):
+@router.get(
+    "/",
+    response_model=Union[List[FormResponse], List[FormSummary]],
+    summary="Получить все формы"
+)
+async def get_forms(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    summary: bool = False,
+    accept_encoding: Optional[str] = Header(None),
+    conn=Depends(get_read_db)
+):
+    after = decode_cursor(cursor)
+    headers = {}
     try:
-        forms = await conn.fetch("SELECT id, title, description FROM forms ORDER BY created_at DESC")
-        return [await get_form_response(conn, form["id"]) for form in forms]
+        if after:
+            forms = await conn.statements["list_forms_after"].fetch(after[0], after[1], limit + 1)
+        else:
+            forms = await conn.statements["list_forms"].fetch(limit + 1)
+
+        if len(forms) > limit:
+            forms = forms[:limit]
+            last = forms[-1]
+            headers["X-Next-Cursor"] = encode_cursor(last["created_at"], last["id"])
+
+        if summary:
+            content = [
+                {"id": f["id"], "title": f["title"], "description": f["description"]}
+                for f in forms
+            ]
+        else:
+            questions = await fetch_questions(conn, [f["id"] for f in forms])
+            content = [{
+                "id": f["id"],
+                "title": f["title"],
+                "description": f["description"],
+                "version": f["version"],
+                "questions": questions.get(f["id"], [])
+            } for f in forms]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch forms: {str(e)}")
+    # Rows come straight from the database, so the response model is documentation only.
+    return json_response(dumps_bytes(content), accept_encoding, headers)
+
+@router.get("/cache/stats", summary="Статистика кэша форм")
+async def get_cache_stats():
+    return cache.form_cache.stats()
 
 @router.get("/{form_id}", response_model=FormResponse, summary="Получить форму по ID")
-async def get_form(form_id: int, conn=Depends(get_db)):
+async def get_form(
+    form_id: int,
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None)
+):
     try:
-        return await get_form_response(conn, form_id)
+        version, cached = await load_document(form_id)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch form: {str(e)}")
 
-@router.put("/{form_id}", response_model=FormResponse, summary="Обновить форму")
-async def update_form(form_id: int, form: FormCreate, conn=Depends(get_db)):
+    encoding = negotiate(accept_encoding, len(cached.body))
+    headers = {"ETag": variant_etag(cached.etag, encoding), "Vary": "Accept-Encoding"}
+    if cache.etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    if encoding is None:
+        return json_response(cached.body, None, headers)
+
+    # Repeat reads of an unchanged form reuse the compressed bytes as well.
+    body = await cache.form_cache.get_encoded(form_id, version, encoding)
+    if body is None:
+        body = compress(cached.body, encoding)
+        await cache.form_cache.put_encoded(form_id, version, encoding, body)
+    return json_response(body, None, headers, encoding=encoding)
+
+@router.put("/{form_id}", response_model=FormResponse, summary="Обновить форму", dependencies=[Depends(require_user)])
+async def update_form(
+    form_id: int,
+    form: FormUpdate,
+    diff: bool = Query(False, description="Изменить только отличающиеся вопросы"),
+    conn=Depends(get_db)
+):
     try:
         async with conn.transaction():
-            updated_form = await conn.fetchrow(
-                "UPDATE forms SET title = $1, description = $2 WHERE id = $3 RETURNING id, title, description",
-                form.title, form.description, form_id
+            await update_form_row(conn, form_id, form.version, form.title, form.description)
+            if diff:
+                await sync_questions(conn, form_id, form.questions)
+            else:
+                await conn.statements["delete_form_questions"].fetch(form_id)
+                await insert_questions(conn, form_id, form.questions)
+            documents = await refresh_documents(conn, [form_id])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to update form: {str(e)}")
+    await cache.form_cache.invalidate(form_id)
+    return Response(content=documents[form_id], media_type="application/json")
+
+@router.patch(
+    "/{form_id}",
+    response_model=FormResponse,
+    summary="Частично обновить форму",
+    dependencies=[Depends(require_user)]
+)
+async def patch_form(form_id: int, patch: FormPatch, conn=Depends(get_db)):
+    fields = patch.dict(exclude_unset=True)
+    try:
+        async with conn.transaction():
+            await update_form_row(
+                conn, form_id, patch.version, patch.title, patch.description,
+                set_description="description" in fields
             )
-            
-            if not updated_form:
-                raise HTTPException(status_code=404, detail="Form not found")
-            
-            await conn.execute("DELETE FROM questions WHERE form_id = $1", form_id)
-            
-            for question in form.questions:
-                await conn.execute(
-                    """
-                    INSERT INTO questions (
-                        form_id, question_id, title, type, required,
-                        options, min_value, max_value, min_label, max_label
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
-                    """,
-                    form_id, question.id, question.title, question.type.value,
-                    question.required, json.dumps(question.options) if question.options else None,
-                    question.min_value, question.max_value, question.min_label, question.max_label
-                )
-            
-            return await get_form_response(conn, form_id)
+            if patch.questions is not None:
+                await sync_questions(conn, form_id, patch.questions)
+            documents = await refresh_documents(conn, [form_id])
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to update form: {str(e)}")
+    await cache.form_cache.invalidate(form_id)
+    return Response(content=documents[form_id], media_type="application/json")
 
-@router.delete("/{form_id}", summary="Удалить форму")
+@router.delete("/{form_id}", summary="Удалить форму", dependencies=[Depends(require_user)])
 async def delete_form(form_id: int, conn=Depends(get_db)):
     try:
         async with conn.transaction():
-            deleted = await conn.execute(
-                "DELETE FROM forms WHERE id = $1 RETURNING id", 
-                form_id
-            )
+            deleted = await conn.statements["delete_form"].fetchval(form_id)
             if not deleted:
                 raise HTTPException(status_code=404, detail="Form not found")
-            return {"message": "Form deleted successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete form: {str(e)}")
+    await cache.form_cache.invalidate(form_id)
+    return {"message": "Form deleted successfully"}
 
-async def get_form_response(conn, form_id: int):
-    form = await conn.fetchrow(
-        "SELECT id, title, description FROM forms WHERE id = $1", 
-        form_id
-    )
-    if not form:
-        raise HTTPException(status_code=404, detail="Form not found")
-        
-    questions = await conn.fetch(
-        """
-        SELECT 
-            question_id as id, 
-            title, 
-            type, 
-            required,
-            options,
-            min_value,
-            max_value,
-            min_label,
-            max_label
-        FROM questions WHERE form_id = $1
-        """,
-        form_id
+async def update_form_row(conn, form_id: int, expected_version: Optional[int],
+                          title: Optional[str], description: Optional[str],
+                          set_description: bool = True):
+    updated = await conn.statements["update_form"].fetchval(
+        form_id, title, description, set_description, expected_version
     )
-    
-    return {
-        "id": form["id"],
-        "title": form["title"],
-        "description": form["description"],
-        "questions": [{
-            "id": q["id"],
-            "title": q["title"],
-            "type": q["type"],
-            "required": q["required"],
-            "options": json.loads(q["options"]) if q["options"] else None,
-            "min_value": q["min_value"],
-            "max_value": q["max_value"],
-            "min_label": q["min_label"],
-            "max_label": q["max_label"]
-        } for q in questions]
-    }
\ No newline at end of file
+    if updated is None:
+        current = await conn.statements["form_version"].fetchval(form_id)
+        if current is None:
+            raise HTTPException(status_code=404, detail="Form not found")
+        raise HTTPException(
+            status_code=409,
+            detail=f"Form was modified by someone else (current version {current})"
+        )
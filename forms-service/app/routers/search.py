@@ -0,0 +1,41 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, Query
+
+from ..database import get_read_db
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_search_cursor, encode_search_cursor
+from ..responses import json_response
+from ..schemas import FormSearchResult
+from ..serialization import dumps_bytes
+
+router = APIRouter(prefix="/forms", tags=["search"])
+
+@router.get("/search", response_model=List[FormSearchResult], summary="Полнотекстовый поиск по формам")
+async def search_forms(
+    q: str = Query(..., min_length=1, max_length=256, description="Запрос в синтаксисе websearch"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    accept_encoding: Optional[str] = Header(None),
+    conn=Depends(get_read_db)
+):
+    after = decode_search_cursor(cursor)
+    headers = {}
+    rows = await conn.statements["search_forms"].fetch(
+        q, after[0] if after else None, after[1] if after else None, limit + 1
+    )
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        headers["X-Next-Cursor"] = encode_search_cursor(last["rank"], last["id"])
+    content = [{
+        "id": row["id"],
+        "title": row["title"],
+        "description": row["description"],
+        "rank": row["rank"],
+        "highlights": {
+            "title": row["title_highlight"],
+            "description": row["description_highlight"],
+            "questions": row["question_highlights"]
+        }
+    } for row in rows]
+    return json_response(dumps_bytes(content), accept_encoding, headers)
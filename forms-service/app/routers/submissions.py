@@ -0,0 +1,65 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from fastapi import APIRouter, HTTPException
+
+from .. import database, ingest
+from ..analytics import summarize
+from ..documents import load_document
+from ..schemas import SubmissionAccepted, SubmissionCreate
+from ..serialization import loads
+from ..validation import AnswerError, FormValidator, ValidatorCache
+
+router = APIRouter(prefix="/forms", tags=["submissions"])
+
+validators = ValidatorCache()
+
+async def get_validator(form_id: int) -> FormValidator:
+    # Keyed by the document's ETag rather than the cache counter: a process
+    # that missed an invalidation still rebuilds the validator as soon as the
+    # document it reads changes.
+    _, cached = await load_document(form_id)
+    validator = validators.get(form_id, cached.etag)
+    if validator is None:
+        validator = FormValidator(loads(cached.body))
+        validators.put(form_id, cached.etag, validator)
+    return validator
+
+@router.post(
+    "/{form_id}/submissions",
+    response_model=SubmissionAccepted,
+    status_code=202,
+    summary="Отправить ответы на форму"
+)
+async def submit_answers(form_id: int, submission: SubmissionCreate):
+    validator = await get_validator(form_id)
+    try:
+        rows = validator.validate(submission.answers)
+    except AnswerError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+
+    accepted = ingest.Submission(
+        id=uuid4(),
+        form_id=form_id,
+        form_version=validator.form_version,
+        submitted_at=datetime.now(timezone.utc),
+        answers=rows
+    )
+    try:
+        ingest.submission_writer.submit(accepted)
+    except ingest.QueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many submissions in flight, try again later",
+            headers={"Retry-After": "1"}
+        )
+    return {"id": accepted.id, "form_id": form_id, "form_version": validator.form_version}
+
+@router.get("/{form_id}/analytics", summary="Сводка ответов на форму")
+async def get_analytics(form_id: int):
+    _, cached = await load_document(form_id)
+    async with database.acquire_read() as conn:
+        submission_count = await conn.statements["submission_count"].fetchval(form_id)
+        option_rows = await conn.statements["option_counts"].fetch(form_id)
+        scale_rows = await conn.statements["scale_counts"].fetch(form_id)
+    return summarize(loads(cached.body), submission_count or 0, option_rows, scale_rows)
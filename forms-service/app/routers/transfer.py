@@ -0,0 +1,129 @@
+import zlib
+from typing import AsyncIterator, List, Tuple
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+
+from .. import database
+from ..auth import require_user
+from ..documents import refresh_documents
+from ..queries import QUERIES
+from ..questions import insert_form_questions
+from ..schemas import FormCreate
+from ..serialization import loads
+
+router = APIRouter(prefix="/forms", tags=["transfer"])
+
+EXPORT_PREFETCH = 500
+MAX_REPORTED_ERRORS = 1000
+
+async def export_lines() -> AsyncIterator[bytes]:
+    async with database.acquire_read() as conn:
+        async with conn.transaction():
+            async for row in conn.cursor(QUERIES["export_documents"], prefetch=EXPORT_PREFETCH):
+                yield row[0].encode() + b"\n"
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+@router.get("/export", summary="Выгрузить все формы в NDJSON")
+async def export_forms(gzip: bool = Query(False, description="Сжать ответ gzip")):
+    headers = {"Content-Disposition": 'attachment; filename="forms.ndjson"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+        return StreamingResponse(gzip_stream(export_lines()), media_type="application/x-ndjson", headers=headers)
+    return StreamingResponse(export_lines(), media_type="application/x-ndjson", headers=headers)
+
+async def read_lines(request: Request) -> AsyncIterator[Tuple[int, bytes]]:
+    decompressor = None
+    if request.headers.get("content-encoding", "").lower() == "gzip":
+        decompressor = zlib.decompressobj(31)
+    buffer = b""
+    line_number = 0
+    async for chunk in request.stream():
+        if decompressor is not None:
+            chunk = decompressor.decompress(chunk)
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            yield line_number, line
+    if decompressor is not None:
+        buffer += decompressor.flush()
+    for line in buffer.split(b"\n"):
+        line_number += 1
+        yield line_number, line
+
+async def import_chunk(chunk: List[Tuple[int, FormCreate]]) -> List[int]:
+    async with database.acquire() as conn:
+        async with conn.transaction():
+            ids = [row[0] for row in await conn.statements["allocate_form_ids"].fetch(len(chunk))]
+            await conn.copy_records_to_table(
+                "forms",
+                records=[(form_id, form.title, form.description) for form_id, (_, form) in zip(ids, chunk)],
+                columns=("id", "title", "description")
+            )
+            await insert_form_questions(conn, [
+                (form_id, question, position)
+                for form_id, (_, form) in zip(ids, chunk)
+                for position, question in enumerate(form.questions)
+            ])
+            await refresh_documents(conn, ids)
+    return ids
+
+@router.post("/import", summary="Загрузить формы из NDJSON", dependencies=[Depends(require_user)])
+async def import_forms(
+    request: Request,
+    chunk_size: int = Query(500, ge=1, le=5000, description="Форм в одной транзакции")
+):
+    imported = 0
+    failed = 0
+    errors = []
+
+    def report(line_number: int, error: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"line": line_number, "error": error})
+
+    async def flush(chunk):
+        nonlocal imported
+        try:
+            imported += len(await import_chunk(chunk))
+        except database.DATA_ERRORS as e:
+            # Some line Postgres rejects (a NUL in a title, say): bisect to it
+            # and store the rest, the way ingest splits submission batches.
+            if len(chunk) == 1:
+                report(chunk[0][0], f"Failed to store form: {str(e)}")
+                return
+            middle = len(chunk) // 2
+            await flush(chunk[:middle])
+            await flush(chunk[middle:])
+        except Exception as e:
+            for line_number, _ in chunk:
+                report(line_number, f"Failed to store form: {str(e)}")
+
+    chunk: List[Tuple[int, FormCreate]] = []
+    async for line_number, line in read_lines(request):
+        if not line.strip():
+            continue
+        try:
+            data = loads(line)
+            if not isinstance(data, dict):
+                raise ValueError("expected a JSON object")
+            chunk.append((line_number, FormCreate(**data)))
+        except Exception as e:
+            report(line_number, str(e))
+            continue
+        if len(chunk) >= chunk_size:
+            await flush(chunk)
+            chunk = []
+    if chunk:
+        await flush(chunk)
+
+    return {"imported": imported, "failed": failed, "errors": errors}
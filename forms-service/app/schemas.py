@@ -1,6 +1,7 @@
 from enum import Enum
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, validator
+from typing import Any, Dict, List, Optional
+from uuid import UUID
 
 class QuestionType(str, Enum):
     TEXT = "text"
@@ -16,6 +17,9 @@ class QuestionOption(BaseModel):
     def dict(self, **kwargs):
         return {"id": self.id, "value": self.value}
 
+# Analytics keep one counter per scale value, so a scale is bounded.
+MAX_SCALE_VALUES = 101
+
 class FormQuestion(BaseModel):
     id: str
     title: str
@@ -27,16 +31,76 @@ class FormQuestion(BaseModel):
     min_label: Optional[str] = None
     max_label: Optional[str] = None
 
+    @validator("max_value")
+    def check_scale_range(cls, max_value, values):
+        min_value = values.get("min_value")
+        if max_value is not None and min_value is not None:
+            if max_value < min_value:
+                raise ValueError("max_value must not be less than min_value")
+            if max_value - min_value >= MAX_SCALE_VALUES:
+                raise ValueError(f"a scale has at most {MAX_SCALE_VALUES} values")
+        return max_value
+
     def dict(self, **kwargs):
         data = super().dict(**kwargs)
         if self.options is not None:
             data["options"] = [opt.dict() for opt in self.options]
         return data
 
+def check_unique_question_ids(questions):
+    # Answers, analytics and the diff updates all address questions by id.
+    seen = set()
+    for question in questions or ():
+        if question.id in seen:
+            raise ValueError(f"duplicate question id: {question.id}")
+        seen.add(question.id)
+    return questions
+
 class FormCreate(BaseModel):
     title: str
     description: Optional[str] = None
     questions: List[FormQuestion]
 
+    _unique_question_ids = validator("questions", allow_reuse=True)(check_unique_question_ids)
+
+class FormUpdate(FormCreate):
+    version: Optional[int] = None
+
+class FormPatch(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    questions: Optional[List[FormQuestion]] = None
+    version: Optional[int] = None
+
+    _unique_question_ids = validator("questions", allow_reuse=True)(check_unique_question_ids)
+
 class FormResponse(FormCreate):
-    id: int
\ No newline at end of file
+    id: int
+    version: int = 1
+
+class FormSummary(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+
+class SearchHighlights(BaseModel):
+    title: str
+    description: Optional[str] = None
+    questions: List[str] = []
+
+class FormSearchResult(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    rank: float
+    highlights: SearchHighlights
+
+class SubmissionCreate(BaseModel):
+    # Kept as raw JSON: coercing here would turn true into 1 and 2.0 into 2
+    # before the form's own validator (app.validation) checks the types.
+    answers: Dict[str, Any]
+
+class SubmissionAccepted(BaseModel):
+    id: UUID
+    form_id: int
+    form_version: int
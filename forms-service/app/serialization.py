@@ -0,0 +1,29 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    def dumps_bytes(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    def dumps_response(obj) -> bytes:
+        # Handler results may key dicts by int, like the analytics histograms.
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    loads = orjson.loads
+else:
+    def dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+    def dumps_bytes(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str).encode()
+
+    dumps_response = dumps_bytes
+
+    loads = json.loads
@@ -0,0 +1,114 @@
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .schemas import QuestionType
+
+# (question_id, option_id, value_int, value_text)
+AnswerRow = Tuple[str, Optional[str], Optional[int], Optional[str]]
+
+class AnswerError(ValueError):
+    def __init__(self, errors: Dict[str, str]):
+        super().__init__("Invalid answers")
+        self.errors = errors
+
+def _text_check(question):
+    def check(value) -> List[AnswerRow]:
+        if not isinstance(value, str):
+            raise ValueError("expected a string")
+        return [(question["id"], None, None, value)]
+    return check
+
+def _choice_check(question):
+    option_ids = frozenset(opt["id"] for opt in question.get("options") or [])
+
+    def check(value) -> List[AnswerRow]:
+        if not isinstance(value, str):
+            raise ValueError("expected an option id")
+        if value not in option_ids:
+            raise ValueError("unknown option")
+        return [(question["id"], value, None, None)]
+    return check
+
+def _multi_choice_check(question):
+    option_ids = frozenset(opt["id"] for opt in question.get("options") or [])
+
+    def check(value) -> List[AnswerRow]:
+        if not isinstance(value, list):
+            raise ValueError("expected a list of option ids")
+        if not all(isinstance(option_id, str) for option_id in value):
+            raise ValueError("expected a list of option ids")
+        if len(set(value)) != len(value) or not option_ids.issuperset(value):
+            raise ValueError("unknown or repeated option")
+        return [(question["id"], option_id, None, None) for option_id in value]
+    return check
+
+def _scale_check(question):
+    low = question.get("min_value")
+    high = question.get("max_value")
+
+    def check(value) -> List[AnswerRow]:
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError("expected an integer")
+        if (low is not None and value < low) or (high is not None and value > high):
+            raise ValueError(f"must be between {low} and {high}")
+        return [(question["id"], None, value, None)]
+    return check
+
+CHECK_BUILDERS = {
+    QuestionType.TEXT.value: _text_check,
+    QuestionType.RADIO.value: _choice_check,
+    QuestionType.DROPDOWN.value: _choice_check,
+    QuestionType.CHECKBOX.value: _multi_choice_check,
+    QuestionType.LINEAR_SCALE.value: _scale_check,
+}
+
+def _is_empty(value) -> bool:
+    return value is None or value == "" or value == []
+
+class FormValidator:
+    """Answer checks for one version of a form, built once from its document."""
+
+    def __init__(self, document: dict):
+        self.form_id: int = document["id"]
+        self.form_version: int = document.get("version", 1)
+        self.checks: Dict[str, Callable] = {}
+        self.required: List[str] = []
+        for question in document["questions"]:
+            self.checks[question["id"]] = CHECK_BUILDERS[question["type"]](question)
+            if question["required"]:
+                self.required.append(question["id"])
+
+    def validate(self, answers: dict) -> List[AnswerRow]:
+        errors = {}
+        rows: List[AnswerRow] = []
+        for question_id in self.required:
+            if _is_empty(answers.get(question_id)):
+                errors[question_id] = "answer is required"
+        for question_id, value in answers.items():
+            check = self.checks.get(question_id)
+            if check is None:
+                errors[question_id] = "unknown question"
+            elif not _is_empty(value) and question_id not in errors:
+                try:
+                    rows.extend(check(value))
+                except ValueError as e:
+                    errors[question_id] = str(e)
+        if errors:
+            raise AnswerError(errors)
+        return rows
+
+class ValidatorCache:
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, str], FormValidator]" = OrderedDict()
+
+    def get(self, form_id: int, etag: str) -> Optional[FormValidator]:
+        validator = self._entries.get((form_id, etag))
+        if validator is not None:
+            self._entries.move_to_end((form_id, etag))
+        return validator
+
+    def put(self, form_id: int, etag: str, validator: FormValidator):
+        self._entries[(form_id, etag)] = validator
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
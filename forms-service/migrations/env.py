@@ -1,10 +1,15 @@
+import os
 from logging.config import fileConfig
 
+from dotenv import load_dotenv
 from sqlalchemy import engine_from_config
-from sqlalchemy import pool
+from sqlalchemy import pool, text
+from sqlalchemy.engine import URL
 
 from alembic import context
 
+load_dotenv()
+
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -14,16 +19,33 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
-# add your model's MetaData object here
-# for 'autogenerate' support
-# from myapp import mymodel
-# target_metadata = mymodel.Base.metadata
+# The schema is written as plain SQL in the revisions, there is no model
+# metadata to autogenerate from.
 target_metadata = None
 
-# other values from the config, defined by the needs of env.py,
-# can be acquired:
-# my_important_option = config.get_main_option("my_important_option")
-# ... etc.
+# Session-level advisory lock held while migrating: every forms-service pod
+# runs "alembic upgrade head" on start, and only one of them may apply a
+# revision at a time. The others wait, then find the schema already at head.
+MIGRATION_LOCK = 5_318_003
+
+
+def database_url() -> str:
+    """Same connection settings as the service: DATABASE_URL or the POSTGRES_* variables."""
+    url = os.getenv("DATABASE_URL")
+    if url:
+        return url.replace("postgresql://", "postgresql+psycopg2://", 1)
+    port = os.getenv("POSTGRES_PORT")
+    return URL.create(
+        "postgresql+psycopg2",
+        username=os.getenv("POSTGRES_USER"),
+        password=os.getenv("POSTGRES_PASSWORD"),
+        host=os.getenv("POSTGRES_HOST"),
+        port=int(port) if port else None,
+        database=os.getenv("POSTGRES_DB"),
+    ).render_as_string(hide_password=False)
+
+
+config.set_main_option("sqlalchemy.url", database_url().replace("%", "%%"))
 
 
 def run_migrations_offline() -> None:
@@ -64,12 +86,19 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=target_metadata
-        )
-
-        with context.begin_transaction():
-            context.run_migrations()
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK})
+        connection.commit()
+        try:
+            context.configure(
+                connection=connection, target_metadata=target_metadata
+            )
+
+            with context.begin_transaction():
+                context.run_migrations()
+        finally:
+            connection.rollback()
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK})
+            connection.commit()
 
 
 if context.is_offline_mode():
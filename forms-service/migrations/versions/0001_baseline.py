@@ -0,0 +1,111 @@
+"""Baseline: the schema previously created by the service on startup
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 12:00:00.000000
+
+Every statement is idempotent, so databases created by the old startup DDL
+upgrade through this revision without changes.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS forms (
+        id SERIAL PRIMARY KEY,
+        title TEXT NOT NULL,
+        description TEXT,
+        created_at TIMESTAMP DEFAULT NOW()
+    )
+    """)
+
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS questions (
+        id SERIAL PRIMARY KEY,
+        form_id INTEGER REFERENCES forms(id) ON DELETE CASCADE,
+        question_id TEXT NOT NULL,
+        title TEXT NOT NULL,
+        type TEXT NOT NULL,
+        required BOOLEAN NOT NULL DEFAULT FALSE,
+        options JSONB,
+        min_value INTEGER,
+        max_value INTEGER,
+        min_label TEXT,
+        max_label TEXT
+    )
+    """)
+
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS submissions (
+        id UUID PRIMARY KEY,
+        form_id INTEGER NOT NULL REFERENCES forms(id) ON DELETE CASCADE,
+        form_version INTEGER NOT NULL,
+        submitted_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    )
+    """)
+
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS answers (
+        submission_id UUID NOT NULL REFERENCES submissions(id) ON DELETE CASCADE,
+        form_id INTEGER NOT NULL,
+        question_id TEXT NOT NULL,
+        option_id TEXT,
+        value_int INTEGER,
+        value_text TEXT
+    )
+    """)
+
+    op.execute("ALTER TABLE answers ADD COLUMN IF NOT EXISTS id BIGSERIAL PRIMARY KEY")
+
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS form_submission_counts (
+        form_id INTEGER PRIMARY KEY REFERENCES forms(id) ON DELETE CASCADE,
+        count BIGINT NOT NULL
+    )
+    """)
+
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS question_option_counts (
+        form_id INTEGER NOT NULL REFERENCES forms(id) ON DELETE CASCADE,
+        question_id TEXT NOT NULL,
+        option_id TEXT NOT NULL,
+        count BIGINT NOT NULL,
+        PRIMARY KEY (form_id, question_id, option_id)
+    )
+    """)
+
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS question_scale_counts (
+        form_id INTEGER NOT NULL REFERENCES forms(id) ON DELETE CASCADE,
+        question_id TEXT NOT NULL,
+        value INTEGER NOT NULL,
+        count BIGINT NOT NULL,
+        PRIMARY KEY (form_id, question_id, value)
+    )
+    """)
+
+    op.execute("ALTER TABLE forms ADD COLUMN IF NOT EXISTS document JSONB")
+    op.execute("ALTER TABLE forms ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1")
+    op.execute("ALTER TABLE questions ADD COLUMN IF NOT EXISTS position INTEGER")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS question_scale_counts")
+    op.execute("DROP TABLE IF EXISTS question_option_counts")
+    op.execute("DROP TABLE IF EXISTS form_submission_counts")
+    op.execute("DROP TABLE IF EXISTS answers")
+    op.execute("DROP TABLE IF EXISTS submissions")
+    op.execute("DROP TABLE IF EXISTS questions")
+    op.execute("DROP TABLE IF EXISTS forms")
@@ -0,0 +1,58 @@
+"""Indexes for the hot read paths and a mandatory question position
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 12:10:00.000000
+
+Indexes are built CONCURRENTLY so the upgrade can run against a live
+database; ``python -m app.plans`` checks that the hot queries use them.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    # fetch_questions, lock_questions, refresh_documents and the document
+    # builder look questions up by form and read them in position order.
+    "ix_questions_form_id_position": "questions (form_id, position, id)",
+    # list_forms / list_forms_after keyset pagination.
+    "ix_forms_created_at_id": "forms (created_at DESC, id DESC)",
+    # Analytics rebuild and ON DELETE CASCADE from forms.
+    "ix_submissions_form_id": "submissions (form_id)",
+    "ix_answers_form_id_id": "answers (form_id, id)",
+    # ON DELETE CASCADE from submissions.
+    "ix_answers_submission_id": "answers (submission_id)",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rows written before positions existed keep their insertion order.
+    op.execute("""
+    UPDATE questions q SET position = numbered.position
+    FROM (
+        SELECT id, row_number() OVER (PARTITION BY form_id ORDER BY id) - 1 AS position
+        FROM questions
+    ) numbered
+    WHERE q.id = numbered.id AND q.position IS NULL
+    """)
+    op.execute("ALTER TABLE questions ALTER COLUMN position SET NOT NULL")
+
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    op.execute("ALTER TABLE questions ALTER COLUMN position DROP NOT NULL")
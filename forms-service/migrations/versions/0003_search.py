@@ -0,0 +1,62 @@
+"""Full-text search over form titles, descriptions and question titles
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 12:20:00.000000
+
+Content is Russian and English, so the forms_search configuration copies
+``russian``: Cyrillic words go through the Russian stemmer and ASCII words
+through the English one, with the stop words of each language. Question
+titles are read from the stored document, which every write refreshes in the
+same transaction, so the generated column never lags behind the questions.
+Adding a stored column rewrites the forms table; on large databases run this
+revision in a maintenance window.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # No IF NOT EXISTS for text search configurations; rerunning after a
+    # partial upgrade must not fail on the one created the first time.
+    op.execute("""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'forms_search' AND cfgnamespace = current_schema()::regnamespace) THEN
+            CREATE TEXT SEARCH CONFIGURATION forms_search (COPY = pg_catalog.russian);
+        END IF;
+    END
+    $$
+    """)
+    op.execute("""
+    ALTER TABLE forms ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('forms_search'::regconfig, title), 'A') ||
+        setweight(to_tsvector('forms_search'::regconfig, coalesce(description, '')), 'B') ||
+        setweight(to_tsvector(
+            'forms_search'::regconfig,
+            coalesce(jsonb_path_query_array(document, '$.questions[*].title'), '[]'::jsonb)
+        ), 'C')
+    ) STORED
+    """)
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_forms_search_vector ON forms USING GIN (search_vector)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_forms_search_vector")
+    op.execute("ALTER TABLE forms DROP COLUMN IF EXISTS search_vector")
+    op.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS forms_search")
@@ -0,0 +1,84 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import cache
+from app.main import app
+from app.serialization import dumps_bytes
+
+class FakeStatement:
+    def __init__(self, conn, name):
+        self.conn = conn
+        self.name = name
+
+    async def fetch(self, *args):
+        self.conn.calls.append((self.name, args))
+        handler = self.conn.results.get(self.name)
+        return handler(*args) if callable(handler) else handler
+
+    fetchval = fetch
+
+class FakeStatements:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __getitem__(self, name):
+        return FakeStatement(self.conn, name)
+
+class FakeConnection:
+    """Stands in for a FormsConnection and its prepared statements.
+
+    ``conn.statements[name].fetch(...)`` (or ``fetchval``) is recorded in
+    ``calls`` and answers ``results[name]``, called with the arguments when it
+    is a function; unknown statements answer None. ``async with conn`` yields
+    the connection itself, so it can replace ``database.acquire``.
+    """
+
+    def __init__(self, **results):
+        self.results = results
+        self.calls = []
+        self.statements = FakeStatements(self)
+
+    def called(self, name):
+        return [args for called, args in self.calls if called == name]
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+@pytest.fixture
+def client():
+    # Without the context manager the lifespan, and with it Postgres, never starts.
+    return TestClient(app)
+
+@pytest.fixture
+def documents(monkeypatch):
+    """Serves form documents from a dict instead of the database, through a real form cache."""
+    from app import documents as documents_module
+
+    stored = {}
+    cache.create_form_cache()
+
+    async def fetch_document(conn, form_id):
+        document = stored.get(form_id)
+        return dumps_bytes(document) if document is not None else None
+
+    class NoConnection:
+        async def __aenter__(self):
+            return None
+
+        async def __aexit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(documents_module, "fetch_document", fetch_document)
+    monkeypatch.setattr(documents_module.database, "acquire", NoConnection)
+    monkeypatch.setattr(documents_module.database, "acquire_read", NoConnection)
+    yield stored
+    cache.form_cache = None
@@ -0,0 +1,34 @@
+from app import admission
+from app.admission import TokenBucketLimiter, create_rate_limiter
+
+def test_rate_limiting_is_off_unless_configured(monkeypatch):
+    monkeypatch.delenv("RATE_LIMIT_PER_SECOND", raising=False)
+    assert create_rate_limiter() is None
+    monkeypatch.setenv("RATE_LIMIT_PER_SECOND", "10")
+    limiter = create_rate_limiter()
+    assert (limiter.rate, limiter.burst) == (10, 20)
+
+def test_bucket_allows_a_burst_then_asks_to_wait():
+    limiter = TokenBucketLimiter(rate=1, burst=2)
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") > 0
+    assert limiter.acquire("b") == 0
+
+ORIGIN = {"Origin": "http://localhost:3000"}
+
+def test_shed_responses_are_readable_cross_origin(client, documents, monkeypatch):
+    monkeypatch.setattr(admission, "rate_limiter", TokenBucketLimiter(rate=0.001, burst=1))
+    client.get("/forms/forms/cache/stats", headers=ORIGIN)
+    response = client.get("/forms/forms/cache/stats", headers=ORIGIN)
+    assert response.status_code == 429
+    assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
+    assert "Retry-After" in response.headers["access-control-expose-headers"]
+
+def test_preflights_do_not_spend_tokens(client, monkeypatch):
+    limiter = TokenBucketLimiter(rate=0.001, burst=1)
+    monkeypatch.setattr(admission, "rate_limiter", limiter)
+    preflight = {**ORIGIN, "Access-Control-Request-Method": "POST"}
+    for _ in range(3):
+        assert client.options("/forms/forms/1/submissions", headers=preflight).status_code == 200
+    assert limiter.acquire("testclient") == 0
@@ -0,0 +1,43 @@
+import asyncio
+from collections import namedtuple
+
+import numpy as np
+
+from app import analytics
+from app.analytics import Accumulator, summarize
+from conftest import FakeConnection
+
+Submission = namedtuple("Submission", "form_id answers")
+
+def scale_question(low, high):
+    return {"id": "score", "title": "Score", "type": "linear_scale", "min_value": low, "max_value": high}
+
+def test_summarize_counts_every_scale_value():
+    document = {"id": 1, "questions": [scale_question(1, 5)]}
+    rows = [{"question_id": "score", "value": 2, "count": 3}, {"question_id": "score", "value": 5, "count": 1}]
+    question = summarize(document, 4, [], rows)["questions"][0]
+    assert question["histogram"] == {1: 0, 2: 3, 3: 0, 4: 0, 5: 1}
+    assert question["count"] == 4
+    assert question["mean"] == 2.75
+
+def test_summarize_does_not_expand_unvalidated_huge_scales():
+    document = {"id": 1, "questions": [scale_question(0, 10 ** 9)]}
+    rows = [{"question_id": "score", "value": 7, "count": 2}]
+    assert summarize(document, 2, [], rows)["questions"][0]["histogram"] == {7: 2}
+
+def test_accumulator_handles_sparse_wide_values():
+    accumulator = Accumulator()
+    accumulator.add_scale("score", np.array([1, 10 ** 9, 1], dtype=np.int64))
+    accumulator.add_scale("score", np.array([2, 2, 3], dtype=np.int64))
+    assert accumulator.scales["score"] == {1: 2, 2: 2, 3: 1, 10 ** 9: 1}
+
+def test_increments_take_shared_per_form_locks_first_in_key_order():
+    conn = FakeConnection()
+    batch = [
+        Submission(3, [("q", "o1", None, None)]),
+        Submission(1, [("s", None, 4, None)]),
+        Submission(3, [("q", "o1", None, None)]),
+    ]
+    asyncio.run(analytics.apply_increments(conn, batch))
+    assert conn.calls[0] == ("lock_analytics_shared", (analytics.ANALYTICS_LOCK, [1, 3]))
+    assert conn.calls[1] == ("increment_submission_counts", ([1, 3], [1, 2]))
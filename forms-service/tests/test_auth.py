@@ -0,0 +1,18 @@
+import pytest
+
+from app import auth
+
+@pytest.mark.parametrize("secret", ["", "your-secret-key-here"])
+def test_enforced_auth_refuses_a_public_secret(monkeypatch, secret):
+    monkeypatch.setattr(auth, "AUTH_REQUIRED", True)
+    monkeypatch.setattr(auth.token_verifier, "secret_key", secret)
+    with pytest.raises(RuntimeError, match="JWT_SECRET_KEY"):
+        auth.check_secret()
+
+def test_private_secret_or_optional_auth_starts(monkeypatch):
+    monkeypatch.setattr(auth, "AUTH_REQUIRED", True)
+    monkeypatch.setattr(auth.token_verifier, "secret_key", "0f3c9a")
+    auth.check_secret()
+    monkeypatch.setattr(auth, "AUTH_REQUIRED", False)
+    monkeypatch.setattr(auth.token_verifier, "secret_key", "")
+    auth.check_secret()
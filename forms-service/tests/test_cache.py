@@ -0,0 +1,73 @@
+import asyncio
+
+from app import cache
+from app.cache import FormCache, MemoryBackend, etag_matches
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_invalidation_is_seen_by_every_worker_sharing_the_backend():
+    # One MemoryBackend stands in for the Redis instance the workers share.
+    shared = MemoryBackend()
+    worker_a, worker_b = FormCache(shared), FormCache(shared)
+
+    async def scenario():
+        version = await worker_a.version(1)
+        await worker_a.put(1, version, b'{"title":"old"}')
+        assert (await worker_b.get(1, await worker_b.version(1))).body == b'{"title":"old"}'
+
+        await worker_a.invalidate(1)
+        assert await worker_b.get(1, await worker_b.version(1)) is None
+
+    run(scenario())
+
+def test_private_backends_are_stale_only_until_the_ttl():
+    worker_a, worker_b = FormCache(MemoryBackend(ttl=0.05)), FormCache(MemoryBackend(ttl=0.05))
+
+    async def scenario():
+        await worker_b.put(1, 0, b'{"title":"old"}')
+        await worker_a.invalidate(1)
+        assert await worker_b.get(1, await worker_b.version(1)) is not None
+        await asyncio.sleep(0.06)
+        assert await worker_b.get(1, await worker_b.version(1)) is None
+
+    run(scenario())
+
+def test_encoded_variants_are_dropped_with_the_document():
+    form_cache = FormCache(MemoryBackend())
+
+    async def scenario():
+        await form_cache.put(1, 0, b"{}")
+        await form_cache.put_encoded(1, 0, "gzip", b"gz")
+        await form_cache.invalidate(1)
+        version = await form_cache.version(1)
+        assert await form_cache.get_encoded(1, version, "gzip") is None
+
+    run(scenario())
+
+def test_lru_evicts_oldest_entries():
+    backend = MemoryBackend(max_entries=2)
+
+    async def scenario():
+        for key in ("a", "b", "c"):
+            await backend.set(key, b"x")
+        assert await backend.get("a") is None
+        assert backend.evictions == 1
+
+    run(scenario())
+
+def test_local_cache_defaults_to_a_short_ttl(monkeypatch):
+    monkeypatch.delenv("FORMS_CACHE_URL", raising=False)
+    monkeypatch.delenv("FORMS_CACHE_TTL", raising=False)
+    cache.create_form_cache()
+    try:
+        assert cache.form_cache.backend.ttl == cache.LOCAL_CACHE_TTL
+    finally:
+        run(cache.close_form_cache())
+
+def test_etag_matches():
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches('W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches(None, '"b"')
+    assert not etag_matches('"a"', '"b"')
@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+
+from app.database import check_schema, migration_scripts
+
+class VersionConnection:
+    def __init__(self, revision):
+        self.revision = revision
+
+    async def fetchval(self, query):
+        return self.revision
+
+def check(revision):
+    asyncio.run(check_schema(VersionConnection(revision)))
+
+def test_head_is_read_from_the_migrations():
+    scripts = migration_scripts()
+    check(scripts.get_current_head())
+
+@pytest.mark.parametrize("revision", [None, "0001", "0002"])
+def test_unmigrated_or_older_schemas_stop_startup(revision):
+    with pytest.raises(RuntimeError, match="run `alembic upgrade head`"):
+        check(revision)
+
+def test_revision_from_a_newer_build_is_accepted():
+    check("9999")
@@ -0,0 +1,18 @@
+import asyncio
+
+from app import documents as documents_module
+from app.documents import load_document
+
+def test_cache_misses_are_filled_from_the_primary(documents, monkeypatch):
+    # A replica may still hold the document from before the write that bumped the version.
+    class Unreachable:
+        async def __aenter__(self):
+            raise AssertionError("cache fill went to a replica")
+
+        async def __aexit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(documents_module.database, "acquire_read", Unreachable)
+    documents[1] = {"id": 1, "title": "Survey", "questions": []}
+    _, cached = asyncio.run(load_document(1))
+    assert b'"Survey"' in cached.body
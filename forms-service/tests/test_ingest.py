@@ -0,0 +1,105 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import asyncpg
+import pytest
+
+from app import analytics, ingest
+from app.ingest import Submission, SubmissionWriter
+from conftest import FakeConnection
+
+class IngestConnection(FakeConnection):
+    """Stands in for Postgres: forms in ``forms`` exist, COPYs fail on unknown forms."""
+
+    def __init__(self, forms, poisoned=(), outages=0):
+        super().__init__(lock_forms=lambda ids: [{"id": i} for i in ids if i in self.forms])
+        self.forms = set(forms)
+        self.poisoned = set(poisoned)
+        self.outages = outages
+        self.writes = 0
+        self.copied = {"submissions": [], "answers": []}
+
+    @asynccontextmanager
+    async def transaction(self):
+        pending = {table: [] for table in self.copied}
+        self._pending = pending
+        yield
+        for table, rows in pending.items():
+            self.copied[table].extend(rows)
+
+    async def copy_records_to_table(self, table, records, columns):
+        if table == "submissions":
+            self.writes += 1
+            if self.outages:
+                self.outages -= 1
+                raise ConnectionRefusedError("connection refused")
+        for record in records:
+            if record[1] not in self.forms:
+                raise asyncpg.ForeignKeyViolationError("violates foreign key constraint")
+            if record[0] in self.poisoned:
+                raise asyncpg.CharacterNotInRepertoireError("invalid byte sequence")
+        self._pending[table].extend(records)
+
+@pytest.fixture
+def connection(monkeypatch):
+    holder = {}
+
+    def acquire():
+        return holder["conn"]
+
+    async def apply_increments(conn, batch):
+        pass
+
+    monkeypatch.setattr(ingest.database, "acquire", acquire)
+    monkeypatch.setattr(analytics, "apply_increments", apply_increments)
+    return holder
+
+def submission(form_id):
+    return Submission(uuid4(), form_id, 1, datetime.now(timezone.utc), [("q", "o", None, None)])
+
+def writer():
+    return SubmissionWriter(max_retries=2)
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    real_sleep = asyncio.sleep
+    delays = []
+
+    def sleep(delay):
+        delays.append(delay)
+        return real_sleep(0)
+
+    monkeypatch.setattr(ingest.asyncio, "sleep", sleep)
+    return delays
+
+def test_submissions_of_deleted_forms_do_not_sink_the_batch(connection):
+    connection["conn"] = conn = IngestConnection(forms={1, 2})
+    batch = [submission(1), submission(3), submission(2), submission(3)]
+    asyncio.run(writer()._flush(batch))
+    assert [row[1] for row in conn.copied["submissions"]] == [1, 2]
+    assert len(conn.copied["answers"]) == 2
+
+def test_a_poisoned_submission_is_dropped_alone(connection, no_sleep):
+    batch = [submission(1) for _ in range(5)]
+    connection["conn"] = conn = IngestConnection(forms={1}, poisoned={batch[3].id})
+    asyncio.run(writer()._flush(batch))
+    assert {row[0] for row in conn.copied["submissions"]} == {s.id for s in batch} - {batch[3].id}
+    assert no_sleep == []
+
+def test_outages_retry_the_whole_batch_until_the_database_is_back(connection, no_sleep):
+    batch = [submission(1) for _ in range(8)]
+    connection["conn"] = conn = IngestConnection(forms={1}, outages=10)
+    asyncio.run(writer()._flush(batch))
+    assert conn.writes == 11
+    assert len(conn.copied["submissions"]) == 8
+    assert no_sleep[:3] == [0.5, 1, 2] and max(no_sleep) == ingest.MAX_RETRY_DELAY
+
+def test_a_stopping_writer_gives_up_on_an_outage(connection, no_sleep):
+    connection["conn"] = conn = IngestConnection(forms={1}, outages=10)
+    stopping = writer()
+    stopping._closing = True
+    asyncio.run(stopping._flush([submission(1) for _ in range(8)]))
+    assert conn.writes == 2
+    assert conn.copied["submissions"] == []
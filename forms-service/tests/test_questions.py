@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from app.questions import _is_unchanged, sync_questions
+from app.schemas import FormCreate, FormPatch, FormQuestion
+from conftest import FakeConnection
+
+def question(question_id, title=None, **fields):
+    return FormQuestion(id=question_id, title=title or question_id.upper(), type="text", **fields)
+
+def stored_row(row_id, position, q: FormQuestion):
+    return {"row_id": row_id, "position": position, **q.dict(), "type": q.type.value}
+
+def sync(rows, questions):
+    conn = FakeConnection(lock_questions=rows)
+    counts = asyncio.run(sync_questions(conn, 1, questions))
+    return conn, counts
+
+def test_unchanged_questions_are_not_written():
+    a, b = question("a"), question("b")
+    conn, counts = sync([stored_row(10, 0, a), stored_row(11, 1, b)], [a, b])
+    assert counts == {"inserted": 0, "updated": 0, "deleted": 0}
+    assert [name for name, _ in conn.calls] == ["lock_questions"]
+
+def test_changes_are_classified_and_written_in_bulk():
+    a, b, c = question("a"), question("b"), question("c")
+    rows = [stored_row(10, 0, a), stored_row(11, 1, b), stored_row(12, 2, c)]
+    renamed, added = question("b", "New title"), question("d")
+    # a moves behind b, b is renamed, c is removed, d is new.
+    conn, counts = sync(rows, [renamed, a, added])
+    assert counts == {"inserted": 1, "updated": 2, "deleted": 1}
+    assert conn.called("delete_questions") == [([12],)]
+    row_ids, titles, *_, positions = conn.called("update_questions")[0]
+    assert (row_ids, titles, positions) == ([11, 10], ["New title", "A"], [0, 1])
+    form_ids, question_ids, *_, insert_positions = conn.called("insert_questions")[0]
+    assert (form_ids, question_ids, insert_positions) == ([1], ["d"], [2])
+
+def test_repeated_stored_ids_are_cleaned_up():
+    a = question("a")
+    conn, counts = sync([stored_row(10, 0, a), stored_row(11, 1, a)], [a])
+    assert counts == {"inserted": 0, "updated": 0, "deleted": 1}
+    assert conn.called("delete_questions") == [([11],)]
+
+def test_is_unchanged_compares_every_field_and_the_position():
+    scale = FormQuestion(id="s", title="S", type="linear_scale", min_value=1, max_value=5)
+    row = stored_row(1, 0, scale)
+    assert _is_unchanged(row, scale, 0)
+    assert not _is_unchanged(row, scale, 1)
+    assert not _is_unchanged(row, FormQuestion(**{**scale.dict(), "max_value": 7}), 0)
+
+@pytest.mark.parametrize("model", [FormCreate, FormPatch])
+def test_duplicate_question_ids_are_rejected(model):
+    with pytest.raises(ValidationError, match="duplicate question id: a"):
+        model(title="Form", questions=[question("a"), question("a", "Again")])
@@ -0,0 +1,133 @@
+import asyncio
+import time
+
+import pytest
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app import database, replicas
+from app.replicas import STICKY_COOKIE, Replica, ReplicaSet, read_your_writes_middleware
+from conftest import FakeConnection
+
+def run(coro):
+    return asyncio.run(coro)
+
+class FakePool:
+    """Replica pool stand-in: hands out ``conn`` and answers the lag query with ``lag``."""
+
+    def __init__(self, name, lag=0.0, down=False):
+        self.conn = FakeConnection()
+        self.conn.name = name
+        self.lag = lag
+        self.down = down
+        self.released = []
+
+    async def acquire(self, timeout=None):
+        if self.down:
+            raise ConnectionRefusedError("connection refused")
+        return self.conn
+
+    async def release(self, conn):
+        self.released.append(conn)
+
+    async def fetchval(self, query, timeout=None):
+        if self.down:
+            raise ConnectionRefusedError("connection refused")
+        return self.lag
+
+    async def close(self):
+        pass
+
+def replica(name, healthy=True, **pool):
+    r = Replica(name, None, {})
+    r.pool = FakePool(name, **pool)
+    r.healthy = healthy
+    return r
+
+@pytest.mark.parametrize("pool, healthy", [
+    ({"lag": 0.0}, True),
+    ({"lag": 2.0}, False),
+    ({"down": True}, False),
+])
+def test_health_check_marks_lagging_or_unreachable_replicas(pool, healthy):
+    r = replica("r1", healthy=not healthy, **pool)
+    run(r.check(timeout=1, max_lag=1.0))
+    assert r.healthy is healthy
+
+def test_choose_rotates_over_healthy_replicas():
+    a, b, c = replica("a"), replica("b", healthy=False), replica("c")
+    replica_set = ReplicaSet([a, b, c])
+    assert [replica_set.choose().name for _ in range(4)] == ["a", "c", "a", "c"]
+    a.healthy = c.healthy = False
+    assert replica_set.choose() is None
+
+@pytest.fixture
+def routing(monkeypatch):
+    primary = FakeConnection()
+    primary.name = "primary"
+    monkeypatch.setattr(database, "acquire", lambda: primary)
+
+    def use(*replica_list):
+        monkeypatch.setattr(database, "replica_set", ReplicaSet(list(replica_list)) if replica_list else None)
+
+    return use
+
+async def read_target():
+    async with database.acquire_read() as conn:
+        return conn.name
+
+def test_reads_go_to_a_healthy_replica_and_back_to_its_pool(routing):
+    r = replica("r1")
+    routing(r)
+    assert run(read_target()) == "r1"
+    assert r.pool.released == [r.pool.conn]
+
+@pytest.mark.parametrize("replica_list", [(), (replica("r1", healthy=False),)])
+def test_reads_fall_back_to_the_primary_without_healthy_replicas(routing, replica_list):
+    routing(*replica_list)
+    assert run(read_target()) == "primary"
+
+def test_a_failing_replica_is_marked_down_and_the_primary_serves(routing):
+    r = replica("r1", down=True)
+    routing(r)
+    assert run(read_target()) == "primary"
+    assert not r.healthy
+
+def test_pinned_clients_read_from_the_primary(routing):
+    routing(replica("r1"))
+
+    async def pinned():
+        token = replicas.primary_pinned.set(True)
+        try:
+            return await read_target()
+        finally:
+            replicas.primary_pinned.reset(token)
+
+    assert run(pinned()) == "primary"
+
+def request(method, cookie=None):
+    headers = [(b"cookie", f"{STICKY_COOKIE}={cookie}".encode())] if cookie else []
+    return Request({"type": "http", "method": method, "path": "/", "headers": headers, "query_string": b""})
+
+def middleware(method, status_code=200, cookie=None):
+    seen = {}
+
+    async def call_next(_):
+        seen["pinned"] = replicas.primary_pinned.get()
+        return Response(status_code=status_code)
+
+    response = run(read_your_writes_middleware(request(method, cookie), call_next))
+    return seen["pinned"], response.headers.get("set-cookie", "")
+
+def test_successful_writes_pin_the_client_to_the_primary():
+    pinned, cookie = middleware("PUT")
+    assert not pinned and cookie.startswith(f"{STICKY_COOKIE}=")
+
+@pytest.mark.parametrize("method, status_code", [("GET", 200), ("PUT", 409), ("POST", 202)])
+def test_reads_failures_and_queued_writes_do_not_pin(method, status_code):
+    assert middleware(method, status_code) == (False, "")
+
+def test_the_cookie_pins_reads_until_it_expires():
+    assert middleware("GET", cookie=time.time() + 5)[0]
+    assert not middleware("GET", cookie=time.time() - 1)[0]
+    assert not middleware("GET", cookie="garbage")[0]
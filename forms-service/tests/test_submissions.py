@@ -0,0 +1,96 @@
+import pytest
+
+from app import ingest
+from app.replicas import STICKY_COOKIE
+from conftest import FakeConnection
+
+FORM = {
+    "id": 1,
+    "title": "Survey",
+    "description": None,
+    "version": 1,
+    "questions": [
+        {"id": "color", "title": "Color", "type": "radio", "required": True,
+         "options": [{"id": "red", "value": "Red"}], "min_value": None, "max_value": None,
+         "min_label": None, "max_label": None},
+    ],
+}
+
+SCORE = {"id": "score", "title": "Score", "type": "linear_scale", "required": False, "options": None,
+         "min_value": 0, "max_value": 5, "min_label": None, "max_label": None}
+
+class RecordingWriter:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, submission):
+        self.submitted.append(submission)
+
+@pytest.fixture
+def writer(monkeypatch):
+    writer = RecordingWriter()
+    monkeypatch.setattr(ingest, "submission_writer", writer)
+    return writer
+
+def test_valid_submission_is_queued(client, documents, writer):
+    documents[1] = FORM
+    response = client.post("/forms/forms/1/submissions", json={"answers": {"color": "red"}})
+    assert response.status_code == 202
+    assert [s.answers for s in writer.submitted] == [[("color", "red", None, None)]]
+
+def test_queued_submission_does_not_pin_reads_to_the_primary(client, documents, writer):
+    documents[1] = FORM
+    response = client.post("/forms/forms/1/submissions", json={"answers": {"color": "red"}})
+    assert response.status_code == 202
+    assert STICKY_COOKIE not in response.cookies
+
+def test_list_for_single_choice_is_a_validation_error(client, documents, writer):
+    documents[1] = FORM
+    response = client.post("/forms/forms/1/submissions", json={"answers": {"color": ["red"]}})
+    assert response.status_code == 422
+    assert response.json()["detail"] == {"color": "expected an option id"}
+    assert writer.submitted == []
+
+@pytest.mark.parametrize("value", [True, 2.0, "3"])
+def test_scale_answers_reach_the_validator_uncoerced(client, documents, writer, value):
+    documents[1] = {**FORM, "questions": FORM["questions"] + [SCORE]}
+    response = client.post("/forms/forms/1/submissions", json={"answers": {"color": "red", "score": value}})
+    assert response.status_code == 422
+    assert response.json()["detail"] == {"score": "expected an integer"}
+    assert writer.submitted == []
+
+def test_submission_to_missing_form_is_404(client, documents, writer):
+    response = client.post("/forms/forms/2/submissions", json={"answers": {}})
+    assert response.status_code == 404
+
+def test_validator_follows_the_document_not_the_cache_counter(client, documents, writer):
+    from app import cache
+
+    documents[1] = FORM
+    assert client.post("/forms/forms/1/submissions", json={"answers": {"color": "red"}}).status_code == 202
+
+    # Another replica changed the form; this process never saw the counter
+    # bump, only the document expiring from its cache.
+    documents[1] = {**FORM, "version": 2, "questions": [{**FORM["questions"][0], "options": [{"id": "blue", "value": "Blue"}]}]}
+    cache.form_cache.backend._entries.clear()
+
+    response = client.post("/forms/forms/1/submissions", json={"answers": {"color": "red"}})
+    assert response.status_code == 422
+    assert client.post("/forms/forms/1/submissions", json={"answers": {"color": "blue"}}).json()["form_version"] == 2
+
+def test_analytics_histograms_render_with_int_keys(client, documents, monkeypatch):
+    from app import database
+
+    documents[1] = {**FORM, "questions": FORM["questions"] + [{**SCORE, "min_value": 1}]}
+    conn = FakeConnection(
+        submission_count=3,
+        option_counts=[{"question_id": "color", "option_id": "red", "count": 3}],
+        scale_counts=[{"question_id": "score", "value": 4, "count": 3}],
+    )
+    monkeypatch.setattr(database, "acquire_read", lambda: conn)
+    response = client.get("/forms/forms/1/analytics")
+    assert response.status_code == 200
+    color, score = response.json()["questions"]
+    assert color["options"] == [{"id": "red", "value": "Red", "count": 3}]
+    assert score["histogram"] == {"1": 0, "2": 0, "3": 0, "4": 3, "5": 0}
+    assert score["percentiles"]["p50"] == 4
@@ -0,0 +1,45 @@
+import itertools
+
+import asyncpg
+import pytest
+
+from app.routers import transfer
+from app.serialization import dumps
+from conftest import FakeConnection
+
+class ImportConnection(FakeConnection):
+    """Allocates form ids and rejects titles with NUL, as Postgres text columns do."""
+
+    def __init__(self):
+        ids = itertools.count(1)
+        super().__init__(allocate_form_ids=lambda count: [(next(ids),) for _ in range(count)])
+        self.stored = []
+
+    async def copy_records_to_table(self, table, records, columns):
+        if any("\x00" in title for _, title, _ in records):
+            raise asyncpg.CharacterNotInRepertoireError("invalid byte sequence for encoding \"UTF8\": 0x00")
+        self.stored.extend(title for _, title, _ in records)
+
+@pytest.fixture
+def conn(monkeypatch):
+    conn = ImportConnection()
+
+    async def noop(*args):
+        pass
+
+    monkeypatch.setattr(transfer.database, "acquire", lambda: conn)
+    monkeypatch.setattr(transfer, "insert_form_questions", noop)
+    monkeypatch.setattr(transfer, "refresh_documents", noop)
+    return conn
+
+def test_a_line_postgres_rejects_fails_alone(client, conn):
+    titles = [f"form {i}" for i in range(10)]
+    titles[6] = "bad \x00 title"
+    body = "\n".join(dumps({"title": title, "questions": []}) for title in titles)
+    response = client.post("/forms/forms/import", params={"chunk_size": 10}, content=body)
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["imported"], result["failed"]) == (9, 1)
+    assert result["errors"][0]["line"] == 7
+    assert "0x00" in result["errors"][0]["error"]
+    assert conn.stored == [title for title in titles if "\x00" not in title]
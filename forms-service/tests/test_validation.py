@@ -0,0 +1,73 @@
+import pytest
+
+from app.validation import AnswerError, FormValidator, ValidatorCache
+
+DOCUMENT = {
+    "id": 7,
+    "version": 3,
+    "questions": [
+        {"id": "name", "type": "text", "required": True},
+        {"id": "color", "type": "radio", "required": False,
+         "options": [{"id": "red", "value": "Red"}, {"id": "blue", "value": "Blue"}]},
+        {"id": "size", "type": "dropdown", "required": False,
+         "options": [{"id": "s", "value": "S"}, {"id": "m", "value": "M"}]},
+        {"id": "tags", "type": "checkbox", "required": False,
+         "options": [{"id": "a", "value": "A"}, {"id": "b", "value": "B"}]},
+        {"id": "score", "type": "linear_scale", "required": False, "min_value": 1, "max_value": 5},
+    ],
+}
+
+@pytest.fixture
+def validator():
+    return FormValidator(DOCUMENT)
+
+def errors_of(validator, answers):
+    with pytest.raises(AnswerError) as excinfo:
+        validator.validate(answers)
+    return excinfo.value.errors
+
+def test_valid_answers_become_rows(validator):
+    rows = validator.validate({"name": "Ann", "color": "red", "tags": ["a", "b"], "score": 4})
+    assert rows == [
+        ("name", None, None, "Ann"),
+        ("color", "red", None, None),
+        ("tags", "a", None, None),
+        ("tags", "b", None, None),
+        ("score", None, 4, None),
+    ]
+    assert validator.form_id == 7 and validator.form_version == 3
+
+def test_required_question_must_be_answered(validator):
+    assert errors_of(validator, {"color": "red"}) == {"name": "answer is required"}
+    assert errors_of(validator, {"name": ""}) == {"name": "answer is required"}
+
+def test_unknown_question_is_rejected(validator):
+    assert errors_of(validator, {"name": "Ann", "extra": "x"}) == {"extra": "unknown question"}
+
+@pytest.mark.parametrize("question_id", ["color", "size"])
+@pytest.mark.parametrize("value", [["red"], 1, True, {"id": "red"}])
+def test_single_choice_rejects_non_string_answers(validator, question_id, value):
+    errors = errors_of(validator, {"name": "Ann", question_id: value})
+    assert errors == {question_id: "expected an option id"}
+
+def test_single_choice_rejects_unknown_option(validator):
+    assert errors_of(validator, {"name": "Ann", "color": "green"}) == {"color": "unknown option"}
+
+@pytest.mark.parametrize("value", ["a", ["a", "a"], ["a", "c"], [["a"]], [1]])
+def test_multi_choice_rejects_invalid_answers(validator, value):
+    assert "tags" in errors_of(validator, {"name": "Ann", "tags": value})
+
+@pytest.mark.parametrize("value", [0, 6, True, "3", 2.5])
+def test_scale_rejects_out_of_range_and_non_integers(validator, value):
+    assert "score" in errors_of(validator, {"name": "Ann", "score": value})
+
+def test_empty_optional_answers_are_skipped(validator):
+    assert validator.validate({"name": "Ann", "color": None, "tags": []}) == [("name", None, None, "Ann")]
+
+def test_validator_cache_is_bounded():
+    validators = ValidatorCache(max_entries=1)
+    first, second = FormValidator(DOCUMENT), FormValidator(DOCUMENT)
+    validators.put(1, '"a"', first)
+    validators.put(2, '"b"', second)
+    assert validators.get(1, '"a"') is None
+    assert validators.get(2, '"b"') is second
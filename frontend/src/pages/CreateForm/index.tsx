@@ -38,27 +38,49 @@ const CreateForm: React.FC = () => {
   const [forms, setForms] = useState<Form[]>([]);
   const [showForms, setShowForms] = useState(false);
   const [loadingForms, setLoadingForms] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
 
-  // Загрузка всех форм
-  const fetchForms = async () => {
+  // Загрузка одной страницы списка; следующая — по курсору из X-Next-Cursor
+  const fetchFormsPage = async (cursor: string | null) => {
+    const params = new URLSearchParams({ limit: '50', summary: 'true' });
+    if (cursor) {
+      params.set('cursor', cursor);
+    }
+    const response = await fetch(`http://localhost/api/forms/forms/forms/?${params}`);
+    if (!response.ok) {
+      throw new Error('Ошибка при загрузке форм');
+    }
+    const page: Form[] = await response.json();
+    return { page, cursor: response.headers.get('X-Next-Cursor') };
+  };
+
+  const loadForms = async (cursor: string | null) => {
     setLoadingForms(true);
     setError(null);
     try {
-      const response = await fetch('http://localhost/api/forms/forms/forms/');
-      if (!response.ok) {
-        throw new Error('Ошибка при загрузке форм');
-      }
-      const data = await response.json();
-      setForms(data);
-      setShowForms(!showForms);
+      const { page, cursor: next } = await fetchFormsPage(cursor);
+      setForms(prev => (cursor ? [...prev, ...page] : page));
+      setNextCursor(next);
+      return true;
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Неизвестная ошибка');
       console.error('Ошибка загрузки форм:', err);
+      return false;
     } finally {
       setLoadingForms(false);
     }
   };
 
+  const fetchForms = async () => {
+    if (showForms) {
+      setShowForms(false);
+      return;
+    }
+    if (await loadForms(null)) {
+      setShowForms(true);
+    }
+  };
+
   const addQuestion = () => {
     setQuestions([
       ...questions,
@@ -197,6 +219,15 @@ const CreateForm: React.FC = () => {
               ))}
             </ul>
           )}
+          {nextCursor && (
+            <button
+              onClick={() => loadForms(nextCursor)}
+              className={styles.showFormsButton}
+              disabled={loadingForms}
+            >
+              {loadingForms ? 'Загрузка...' : 'Показать ещё'}
+            </button>
+          )}
         </div>
       )}
 